@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from backend.core.metrics import registry
+
+_MISSING = object()
+
+_hits = registry.counter("cache_hits_total", "Lookups answered from a named in-process cache", labels=("cache",))
+_misses = registry.counter("cache_misses_total", "Lookups a named in-process cache could not answer", labels=("cache",))
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU map for per-process caches.
+    Entries expire after `ttl` seconds (per-entry override on set, None = never)
+    and the least recently used entry is evicted once `maxsize` is reached.
+    Caches given a `name` report hits and misses to the metrics registry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._hits = _hits.labels(name) if name else None
+        self._misses = _misses.labels(name) if name else None
+        self._data: OrderedDict[Hashable, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    if self._hits is not None:
+                        self._hits.inc()
+                    return value
+                del self._data[key]
+        if self._misses is not None:
+            self._misses.inc()
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -7,6 +7,52 @@ load_dotenv()
 class Settings(BaseModel):
     JWT_SECRET: str = os.getenv("JWT_SECRET", "dev-secret")  # fallback for local dev
     JWT_ALGO: str = "HS256"
+    # read replicas (comma-separated URLs); GET routes read from them unless the client wrote recently
+    DATABASE_REPLICA_URLS: list[str] = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    # connection pool (backend.database); size it so workers * (size + overflow) fits max_connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 = never
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_POOL_USE_LIFO: bool = os.getenv("DB_POOL_USE_LIFO", "false").lower() in ("1", "true", "yes")
+    # SQLite production profile (see backend.database): WAL + tuned pragmas on every connection,
+    # likes/saves group-committed by a single writer thread. Ignored for other databases.
+    SQLITE_PRODUCTION: bool = os.getenv("SQLITE_PRODUCTION", "false").lower() in ("1", "true", "yes")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes, 0 = off
+    SQLITE_CACHE_SIZE_KIB: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))  # page cache per connection
+    SQLITE_WRITER_MAX_BATCH: int = int(os.getenv("SQLITE_WRITER_MAX_BATCH", "64"))
+    SQLITE_WRITER_MAX_WAIT_MS: float = float(os.getenv("SQLITE_WRITER_MAX_WAIT_MS", "2"))  # how long a batch waits to fill
+    # per-request SQL accounting (see core.query_stats): Server-Timing header, debug log, N+1 warnings
+    SQL_STATS_ENABLED: bool = os.getenv("SQL_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+    SQL_REPEAT_WARN_THRESHOLD: int = int(os.getenv("SQL_REPEAT_WARN_THRESHOLD", "5"))
+    # on-demand request profiling for admins (X-Profile: 1 or ?_profile=1, see routers.profiles);
+    # off by default so production requests never pay for the flag check
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./profiles")
+    PROFILER_INTERVAL_MS: float = float(os.getenv("PROFILER_INTERVAL_MS", "1"))
+    PROFILER_MAX_FILES: int = int(os.getenv("PROFILER_MAX_FILES", "100"))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
+    # verified-token memo (see core.jwt.decode_claims); entries never outlive the token's exp
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+    JWT_CACHE_MAX_TTL_SECONDS: float = float(os.getenv("JWT_CACHE_MAX_TTL_SECONDS", "300"))
+    # how long an unfiltered listing total may be served from cache (writes invalidate it sooner)
+    COUNT_CACHE_TTL_SECONDS: float = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "30"))
+    # authenticated-principal cache (see core.principal); changes made outside the API show up after the TTL
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    # password hashing process pool (see core.security); 0 workers = hash inline
+    PASSWORD_POOL_WORKERS: int = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_POOL_QUEUE: int = int(os.getenv("PASSWORD_POOL_QUEUE", "32"))
+    PASSWORD_POOL_RETRY_AFTER_SECONDS: int = int(os.getenv("PASSWORD_POOL_RETRY_AFTER_SECONDS", "1"))
+    # password hash cost; tune with `python -m backend.manage calibrate-password-hash`.
+    # The first scheme hashes new passwords, the rest are only verified (and upgraded on login).
+    PASSWORD_SCHEMES: str = os.getenv("PASSWORD_SCHEMES", "bcrypt")
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST_KIB: int = int(os.getenv("ARGON2_MEMORY_COST_KIB", "65536"))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
 
 settings = Settings()
@@ -1,8 +1,17 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from backend.core.config import settings
+from backend.core.cache import TTLCache
+from backend.core.metrics import registry
 from fastapi import HTTPException, status
 
+# sha256(token) -> verified claims; an SPA sends the same bearer token on every call
+_verified = TTLCache(maxsize=settings.JWT_CACHE_SIZE)
+_cache_hits = registry.counter("jwt_cache_hits_total", "Bearer tokens served from the verified-claims cache")
+_cache_misses = registry.counter("jwt_cache_misses_total", "Bearer tokens that needed full signature verification")
+
 def create_access_token(sub: str, expires_minutes: int | None = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -26,18 +35,40 @@ def issue_tokens(user_id: int) -> dict:
         "token_type": "bearer",
     }
 
+def decode_claims(token: str) -> dict:
+    """
+    Verify a JWT and return its claims; every decode in the app goes through here.
+    Verified tokens are memoized until their `exp` (capped at JWT_CACHE_MAX_TTL_SECONDS),
+    so repeat requests skip the HMAC check and JSON parsing. Raises JWTError.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    claims = _verified.get(key)
+    if claims is not None:
+        _cache_hits.inc()
+        return dict(claims)
+
+    _cache_misses.inc()
+    claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGO])
+    ttl = settings.JWT_CACHE_MAX_TTL_SECONDS
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _verified.set(key, dict(claims), ttl=ttl)
+    return claims
+
+
+def clear_jwt_cache() -> None:
+    _verified.clear()
+
+
 def decode_token(token: str) -> dict:
     """
     Decode a JWT and return its payload.
     Raises HTTPException if the token is invalid or expired.
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGO],
-        )
-        return payload
+        return decode_claims(token)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,230 @@
+import bisect
+import threading
+from typing import Callable, Optional
+
+# latency buckets in seconds, upper bounds (the last, implicit bucket is +Inf)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _PerThread:
+    """
+    Per-thread cells for counters and histograms: each thread only ever writes
+    its own list, so recording takes no lock. Readers sum every thread's cells
+    (a snapshot may miss an update that is happening at that moment).
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._all: list[list[float]] = []
+        self._lock = threading.Lock()  # only taken the first time a thread records
+
+    def mine(self) -> list[float]:
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = [0] * self._size
+            with self._lock:
+                self._all.append(cells)
+            self._local.cells = cells
+            return cells
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            shards = list(self._all)
+        return [sum(cells[i] for cells in shards) for i in range(self._size)]
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._cells = _PerThread(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.mine()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Either set explicitly (inc/dec/set) or read from `fn` at snapshot time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help
+        self._fn = fn
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._fn() if self._fn is not None else self._value
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # one cell per bucket (+Inf last), then sum, then count
+        self._cells = _PerThread(len(self.buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        cells = self._cells.mine()
+        cells[bisect.bisect_left(self.buckets, value)] += 1
+        cells[-2] += value
+        cells[-1] += 1
+
+    def snapshot(self):
+        totals = self._cells.totals()
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets + (float("inf"),), totals):
+            running += n
+            cumulative["+Inf" if bound == float("inf") else repr(bound)] = running
+        return {"count": totals[-1], "sum": totals[-2], "buckets": cumulative}
+
+
+class Family:
+    """
+    A metric split by label values, e.g. request latency per (route, method, status).
+    `labels(...)` returns the child metric for one combination, creating it on first use.
+    """
+
+    def __init__(self, cls, name: str, help: str, label_names: tuple[str, ...], **kwargs):
+        self.kind = cls.kind
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._cls = cls
+        self._kwargs = kwargs
+        self._children: dict[tuple[str, ...], Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Counter | Gauge | Histogram:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._cls(self.name, self.help, **self._kwargs))
+        return child
+
+    def children(self) -> list[tuple[tuple[str, ...], Counter | Gauge | Histogram]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def snapshot(self):
+        return {
+            ",".join(f"{k}={v}" for k, v in zip(self.label_names, key)): child.snapshot()
+            for key, child in self.children()
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics. Modules register what they measure at import time;
+    `snapshot()` renders everything as plain JSON-able data, `render_prometheus()`
+    in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram | Family] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if existing.kind != metric.kind or type(existing) is not type(metric):
+                    raise ValueError(f"metric {metric.name!r} already registered as a {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter | Family:
+        if labels:
+            return self._register(Family(Counter, name, help, labels))
+        return self._register(Counter(name, help))
+
+    def gauge(self, name: str, help: str, fn: Optional[Callable[[], float]] = None, labels: tuple[str, ...] = ()) -> Gauge | Family:
+        if labels:
+            return self._register(Family(Gauge, name, help, labels))
+        return self._register(Gauge(name, help, fn))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS, labels: tuple[str, ...] = ()) -> Histogram | Family:
+        if labels:
+            return self._register(Family(Histogram, name, help, labels, buckets=buckets))
+        return self._register(Histogram(name, help, buckets))
+
+    def metrics(self) -> list:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> dict:
+        return {m.name: m.snapshot() for m in self.metrics()}
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if isinstance(metric, Family):
+                for values, child in metric.children():
+                    lines.extend(_samples(metric.name, child, list(zip(metric.label_names, values))))
+            else:
+                lines.extend(_samples(metric.name, metric, []))
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _samples(name: str, metric, pairs: list[tuple[str, str]]) -> list[str]:
+    if isinstance(metric, Histogram):
+        snap = metric.snapshot()
+        out = [f"{name}_bucket{_labels(pairs + [('le', le)])} {_number(n)}" for le, n in snap["buckets"].items()]
+        out.append(f"{name}_sum{_labels(pairs)} {_number(snap['sum'])}")
+        out.append(f"{name}_count{_labels(pairs)} {_number(snap['count'])}")
+        return out
+    return [f"{name}{_labels(pairs)} {_number(metric.snapshot())}"]
+
+
+registry = MetricsRegistry()
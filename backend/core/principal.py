@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    What most authenticated routes need to know about the caller. Cached per
+    process so a request doesn't pay a users-table lookup before its real work;
+    routes that need the full ORM User load it explicitly (get_current_user_full).
+    """
+    id: int
+    username: str
+    is_admin: bool
+
+
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS, name="principal")
+
+
+def remember_principal(user) -> Principal:
+    principal = Principal(id=user.id, username=user.username, is_admin=bool(user.is_admin))
+    principal_cache.set(user.id, principal)
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Call whenever a user's username/admin flag changes or the user is deleted."""
+    principal_cache.pop(user_id)
@@ -0,0 +1,154 @@
+"""
+On-demand request profiling: a sampling profiler for one thread plus a small
+on-disk store for the results.
+
+SamplingProfiler reads the target thread's Python stack every `interval`
+seconds from a helper thread (sys._current_frames), so the profiled code runs
+unmodified and nothing is paid unless a profile is being taken. The event
+loop thread is shared, so a profile also shows whatever else the loop ran
+meanwhile; time spent waiting on the network shows up as the loop's select().
+
+Profiles are exported in the speedscope format (https://www.speedscope.app):
+open the .speedscope.json file there for a flame graph / time-ordered view.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self._frames: list[dict] = []
+        self._frame_index: dict[tuple[str, str, int], int] = {}
+        self._samples: list[list[int]] = []
+        self._weights: list[float] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = self._stopped = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._stopped = time.perf_counter()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self) -> None:
+        last = self._started
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self._samples.append(self._stack(frame))
+                self._weights.append(now - last)
+            last = now
+
+    def _stack(self, frame) -> list[int]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self._frames)
+                self._frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()  # speedscope wants root first
+        return stack
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._samples)
+
+    def speedscope(self, name: str) -> dict:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "foodgram",
+            "name": name,
+            "shared": {"frames": self._frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self._stopped - self._started,
+                "samples": self._samples,
+                "weights": self._weights,
+            }],
+        }
+
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ProfileStore:
+    """
+    Profiles on local disk: `<id>.json` (request, timings, SQL timeline) next to
+    `<id>.speedscope.json`. Only the newest `max_files` profiles are kept.
+    """
+
+    def __init__(self, directory: str, max_files: int = 100):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def save(self, meta: dict, speedscope: dict) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = uuid.uuid4().hex
+        meta = {"id": profile_id, "created_at": datetime.now(timezone.utc).isoformat(), **meta}
+        self._write(self.directory / f"{profile_id}.speedscope.json", speedscope)
+        self._write(self.directory / f"{profile_id}.json", meta)
+        self._prune()
+        return profile_id
+
+    def _write(self, path: Path, data: dict) -> None:
+        # write-then-rename so a reader never sees half a file
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, path)
+
+    def _metas(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        metas = [p for p in self.directory.glob("*.json") if _PROFILE_ID.match(p.stem)]
+        return sorted(metas, key=lambda p: p.stat().st_mtime, reverse=True)
+
+    def _prune(self) -> None:
+        for meta in self._metas()[self.max_files:]:
+            meta.unlink(missing_ok=True)
+            meta.with_name(f"{meta.stem}.speedscope.json").unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        return [json.loads(p.read_text()) for p in self._metas()]
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.json"
+        return json.loads(path.read_text()) if path.is_file() else None
+
+    def speedscope_path(self, profile_id: str) -> Optional[Path]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.speedscope.json"
+        return path if path.is_file() else None
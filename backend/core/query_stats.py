@@ -0,0 +1,120 @@
+"""
+Per-request SQL accounting: how many statements ran, how long the database
+took, and which statement shapes repeated (the signature of an N+1).
+
+Engine-level hooks (installed for every Engine, async ones included) feed
+the QueryStats active in the current context. `QueryStatsMiddleware` opens
+one per request, reports it in a `Server-Timing` header and the debug log, and
+warns when one shape repeats SQL_REPEAT_WARN_THRESHOLD times or more. Tests
+use `track_queries()` directly to hold endpoints to a query budget.
+
+The middleware is plain ASGI: the app runs in the middleware's own task, so
+the tracker it puts in the context var is the one the engine hooks see.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from backend.core.config import settings
+
+logger = logging.getLogger("backend.sql")
+
+# every tracker open in this context; nested ones (a test around the middleware's) all see each statement
+_active: ContextVar[tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+
+# quoted strings, numbers and every driver's placeholder style become "?"
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\$\d+|%\(\w+\)s|\?")
+_SPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\?(?:, \?)+\)")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape: literals and parameters replaced, IN lists collapsed, whitespace squeezed."""
+    shape = _SPACE.sub(" ", _LITERAL.sub("?", statement)).strip()
+    return _IN_LIST.sub("(?)", shape)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    # every statement with its start offset, when asked for (the request profiler wants it)
+    timeline: Optional[list[dict]] = None
+    origin: float = field(default_factory=time.perf_counter)
+
+    def record(self, statement: str, seconds: float, started: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[fingerprint(statement)] += 1
+        if self.timeline is not None:
+            self.timeline.append({
+                "start_ms": round((started - self.origin) * 1000, 3),
+                "duration_ms": round(seconds * 1000, 3),
+                "statement": statement,
+            })
+
+    def repeated(self, threshold: int = 2) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+@contextmanager
+def track_queries(timeline: bool = False) -> Iterator[QueryStats]:
+    """Count the statements run in this context (and tasks started from it) until exit."""
+    stats = QueryStats(timeline=[] if timeline else None)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() and context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for stats in _active.get():
+        stats.record(statement, elapsed, started)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_STATS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                # statements run while the body streams come after this header, and only reach the log
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        method, path = scope["method"], scope["path"]
+        logger.debug("%s %s: %d queries, %.1f ms in db", method, path, stats.count, stats.seconds * 1000)
+        for shape, n in stats.repeated(settings.SQL_REPEAT_WARN_THRESHOLD):
+            logger.warning("possible N+1 in %s %s: ran %d times: %s", method, path, n, shape)
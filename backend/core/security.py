@@ -1,8 +1,152 @@
+"""
+Password hashing. bcrypt costs tens of milliseconds of CPU and holds the GIL
+while it runs, so the work is shipped to a small dedicated process pool and
+awaited, instead of stalling the event loop.
+
+The pool is bounded: at most PASSWORD_POOL_WORKERS hashes run at once and at
+most PASSWORD_POOL_QUEUE more may wait. Anything beyond that fails fast with
+503 + Retry-After rather than letting a login burst pile up requests.
+PASSWORD_POOL_WORKERS=0 hashes on a worker thread instead.
+
+Cost parameters come from settings. Hashes made with another scheme or cost
+are reported by verify_and_update_password so login can replace them.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def hash_password(plain: str) -> str:
+from backend.core.config import settings
+from backend.core.metrics import registry
+
+
+def build_context(
+        schemes: list[str],
+        bcrypt_rounds: int,
+        argon2_time_cost: int,
+        argon2_memory_cost: int,
+        argon2_parallelism: int,
+    ) -> CryptContext:
+    options = {}
+    if "bcrypt" in schemes:
+        # min == max == default, so a hash at any other cost counts as stale
+        options.update(bcrypt__default_rounds=bcrypt_rounds, bcrypt__min_rounds=bcrypt_rounds, bcrypt__max_rounds=bcrypt_rounds)
+    if "argon2" in schemes:
+        # needs the optional argon2-cffi package
+        options.update(
+            argon2__time_cost=argon2_time_cost,
+            argon2__memory_cost=argon2_memory_cost,
+            argon2__parallelism=argon2_parallelism,
+        )
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+pwd_context = build_context(
+    [s.strip() for s in settings.PASSWORD_SCHEMES.split(",") if s.strip()],
+    settings.BCRYPT_ROUNDS,
+    settings.ARGON2_TIME_COST,
+    settings.ARGON2_MEMORY_COST_KIB,
+    settings.ARGON2_PARALLELISM,
+)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, settings.PASSWORD_POOL_WORKERS) + settings.PASSWORD_POOL_QUEUE)
+_inflight = 0
+_inflight_lock = threading.Lock()
+
+hash_seconds = registry.histogram("password_hash_seconds", "Time to hash/verify a password, including queueing")
+rejected_total = registry.counter("password_pool_rejected_total", "Password operations refused because the pool was full")
+registry.gauge("password_pool_inflight", "Password operations running or queued", fn=lambda: _inflight)
+registry.gauge(
+    "password_pool_queue_depth",
+    "Password operations waiting for a free worker",
+    fn=lambda: max(0, _inflight - settings.PASSWORD_POOL_WORKERS),
+)
+
+
+def _hash(plain: str) -> str:
     return pwd_context.hash(plain)
 
-def verify_password(plain: str, hashed: str) -> bool:
+
+def _verify(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
+
+
+def _verify_and_update(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already runs DB connections and threads is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_password_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def _slot():
+    global _inflight
+    if not _slots.acquire(blocking=False):
+        rejected_total.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, try again shortly",
+            headers={"Retry-After": str(settings.PASSWORD_POOL_RETRY_AFTER_SECONDS)},
+        )
+    with _inflight_lock:
+        _inflight += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        hash_seconds.observe(time.perf_counter() - started)
+        with _inflight_lock:
+            _inflight -= 1
+        _slots.release()
+
+
+async def _run(fn, *args):
+    with _slot():
+        if settings.PASSWORD_POOL_WORKERS <= 0:
+            return await run_in_threadpool(fn, *args)
+        try:
+            return await asyncio.wrap_future(_get_pool().submit(fn, *args))
+        except BrokenProcessPool:
+            # a worker died (OOM-killed, ...): start a fresh pool for the next caller
+            shutdown_password_pool()
+            raise
+
+
+async def hash_password(plain: str) -> str:
+    return await _run(_hash, plain)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run(_verify, plain, hashed)
+
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """(matches, replacement hash or None). A replacement is returned only for a
+    correct password whose stored hash uses an outdated scheme or cost."""
+    return await _run(_verify_and_update, plain, hashed)
@@ -0,0 +1,123 @@
+"""
+Single-writer commit queue for SQLite.
+
+SQLite allows one writer at a time, and every COMMIT is an fsync. With many
+requests writing concurrently that means lock contention ("database is
+locked") and one fsync per like. The writer thread owns the only write
+connection and drains the queue in batches: one BEGIN IMMEDIATE, every queued
+job in its own SAVEPOINT (so a failing job only undoes itself), one COMMIT.
+Callers get their result only after the batch is durable.
+
+Jobs are plain functions `fn(conn, *args)` that run Core statements on a sync
+Connection and must not commit.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import StaticPool
+
+from backend.core.metrics import registry
+
+batch_size = registry.histogram(
+    "sqlite_writer_batch_size", "Write jobs committed together", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+commits_total = registry.counter("sqlite_writer_commits_total", "Group commits issued by the SQLite writer")
+queue_depth = registry.gauge("sqlite_writer_queue_depth", "Write jobs waiting for the SQLite writer")
+
+_STOP = object()
+
+
+class SQLiteWriter:
+    def __init__(self, url: str, max_batch: int = 64, max_wait: float = 0.002, connect_hook: Callable | None = None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+        @event.listens_for(self._engine, "connect")
+        def _connect(dbapi_conn, _):
+            if connect_hook is not None:
+                connect_hook(dbapi_conn)
+            # let SQLAlchemy, not the sqlite3 module, decide where transactions begin
+            dbapi_conn.isolation_level = None
+
+        @event.listens_for(self._engine, "begin")
+        def _begin(conn):
+            # take the write lock up front instead of failing on upgrade mid-transaction
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        fut: Future = Future()
+        self._queue.put((fut, fn, args))
+        queue_depth.set(self._queue.qsize())
+        return fut
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._engine.dispose()
+
+    def _next_batch(self, first) -> tuple[list, bool]:
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                stop = True
+                break
+            batch.append(job)
+        return batch, stop
+
+    def _run(self) -> None:
+        with self._engine.connect() as conn:
+            while True:
+                job = self._queue.get()
+                if job is _STOP:
+                    return
+                batch, stop = self._next_batch(job)
+                queue_depth.set(self._queue.qsize())
+                self._commit(conn, [j for j in batch if j[0].set_running_or_notify_cancel()])
+                if stop:
+                    return
+
+    def _commit(self, conn: Connection, batch: list) -> None:
+        if not batch:
+            return
+        outcomes = []
+        try:
+            with conn.begin():
+                for _, fn, args in batch:
+                    try:
+                        with conn.begin_nested():
+                            outcomes.append((True, fn(conn, *args)))
+                    except Exception as exc:
+                        outcomes.append((False, exc))
+        except Exception as exc:
+            # the COMMIT itself failed: nothing in the batch was written
+            for fut, _, _ in batch:
+                fut.set_exception(exc)
+            return
+
+        commits_total.inc()
+        batch_size.observe(len(batch))
+        for (fut, _, _), (ok, value) in zip(batch, outcomes):
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
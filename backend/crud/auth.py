@@ -1,14 +1,15 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from fastapi import FastAPI, HTTPException, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from fastapi import HTTPException, status
 from backend.models.user import User
 from backend.core.security import hash_password, verify_password
+from backend.crud.counts import invalidate_counts
 
-def create_user(db: Session, name: str, uemail: str, upassword: str) -> User:
+async def create_user(db: AsyncSession, name: str, uemail: str, upassword: str) -> User:
 
     #check that username and email are unique
-    user_exists = db.query(User).filter(User.username == name).first()
-    email_exists = db.query(User).filter(User.email == uemail).first()
+    user_exists = await db.scalar(select(User.id).where(User.username == name))
+    email_exists = await db.scalar(select(User.id).where(User.email == uemail))
 
     if user_exists:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
@@ -17,31 +18,32 @@ def create_user(db: Session, name: str, uemail: str, upassword: str) -> User:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
     
     #hash password first
-    hashed_pw = hash_password(upassword)
+    hashed_pw = await hash_password(upassword)
     
     #create the new user
     new_user = User(username = name, email = uemail, hashed_password = hashed_pw)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    invalidate_counts("users")
+    await db.refresh(new_user)
 
     return new_user
 
-def get_user_by_login(db: Session, login: str) -> User | None:
+async def get_user_by_login(db: AsyncSession, login: str) -> User | None:
     '''
     Returns a user by being given either a username or email
     '''
-    user = db.query(User).filter(or_(User.username == login, User.email == login)).first()
+    user = await db.scalar(select(User).where(or_(User.username == login, User.email == login)))
     return user
 
-def authenticate_user(db: Session, login: str, password: str) -> User | None:
+async def authenticate_user(db: AsyncSession, login: str, password: str) -> User | None:
     '''
     Returns true if user is authenticated successfully
     '''
-    user = get_user_by_login(db, login)
+    user = await get_user_by_login(db, login)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
 
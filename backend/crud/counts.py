@@ -0,0 +1,108 @@
+"""
+Listing totals without paying for a COUNT(*) on every request.
+
+Modes:
+- exact:     COUNT(*) over the filtered set (unfiltered totals are served from
+             a short-TTL cache).
+- estimated: planner statistics on PostgreSQL (pg_class.reltuples, or the row
+             estimate from EXPLAIN when filtered); a TTL-cached exact count
+             everywhere else.
+- none:      no total at all; clients page with has_more/next_cursor.
+
+Every cache key carries its namespace's generation, and writes bump the
+generation through `invalidate_counts`, so a write makes all cached totals for
+that listing unreachable at once.
+"""
+import itertools
+import json
+from typing import Hashable, Literal, Optional
+
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+
+TotalMode = Literal["exact", "estimated", "none"]
+
+_totals = TTLCache(maxsize=4096, ttl=settings.COUNT_CACHE_TTL_SECONDS, name="count_totals")
+_generations = TTLCache(maxsize=65536)
+_clock = itertools.count(1)
+
+
+def _generation(namespace: str) -> int:
+    gen = _generations.get(namespace)
+    if gen is None:
+        # unseen (or evicted) namespace: a fresh generation can't match any stale key
+        gen = next(_clock)
+        _generations.set(namespace, gen)
+    return gen
+
+
+def invalidate_counts(namespace: str) -> None:
+    """Call after any write that changes the size of a listing."""
+    _generations.set(namespace, next(_clock))
+
+
+def clear_count_cache() -> None:
+    _totals.clear()
+    _generations.clear()
+
+
+async def _pg_estimate(db: AsyncSession, stmt: Select, id_col, filtered: bool) -> Optional[int]:
+    conn = await db.connection()
+    if not filtered:
+        table = id_col.property.parent.local_table.name
+        est = (await conn.exec_driver_sql(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass($1)", (table,)
+        )).scalar()
+        # reltuples is -1 until the table has been vacuumed/analyzed once
+        return int(est) if est is not None and est >= 0 else None
+
+    compiled = stmt.with_only_columns(id_col).order_by(None).compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(
+        db: AsyncSession,
+        stmt: Select,
+        id_col,
+        mode: TotalMode,
+        namespace: str,
+        filters: tuple[Hashable, ...] = (),
+        cache_exact: bool = False,
+    ) -> Optional[int]:
+    """
+    Total rows matched by `stmt` according to `mode` (None for mode="none").
+    `filters` must identify the active filters; an all-None tuple means unfiltered.
+    Exact filtered totals are only cached with `cache_exact`, for filters the
+    namespace already pins (e.g. the user of "saves:{id}"), whose writes invalidate it.
+    """
+    if mode == "none":
+        return None
+
+    filtered = any(f is not None and f != () for f in filters)
+    dialect = db.get_bind().dialect.name
+
+    if mode == "estimated" and dialect == "postgresql":
+        est = await _pg_estimate(db, stmt, id_col, filtered)
+        if est is not None:
+            return est
+
+    cacheable = not filtered or mode == "estimated" or cache_exact
+    key = (namespace, _generation(namespace), filters)
+    if cacheable:
+        cached = _totals.get(key)
+        if cached is not None:
+            return cached
+
+    total = await db.scalar(stmt.with_only_columns(func.count(id_col)).order_by(None)) or 0
+    if cacheable:
+        _totals.set(key, total)
+    return total
@@ -0,0 +1,93 @@
+"""
+Shared offset/keyset pagination for the listing CRUD functions.
+
+A cursor is an opaque urlsafe-base64 JSON blob that remembers the sort it was
+issued for plus the (sort value, id) of the last row on the page. The next page
+is then fetched with `WHERE (sort_col, id) > (value, id)` (or `<` for desc),
+which an index on (sort_col, id) serves directly, so page 1000 costs the same
+as page 1.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(sort_by: str, sort_dir: str, value: Any, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = {"s": sort_by, "d": sort_dir, "v": value, "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_dir: str) -> tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        last_id = int(payload["id"])
+        cursor_sort = (payload["s"], payload["d"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if cursor_sort != (sort_by, sort_dir):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match sort_by/sort_dir")
+    return value, last_id
+
+
+async def paginate(
+        db: AsyncSession,
+        stmt: Select,
+        *,
+        sort_col,
+        id_col,
+        sort_by: str,
+        sort_dir: str,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        key: Callable[[Any], tuple[Any, int]],
+    ) -> tuple[list, Optional[str]]:
+    """
+    Order `stmt` by (sort_col, id_col) and fetch one page.
+
+    With a cursor the page starts right after the row it points at and
+    `offset` is ignored; otherwise plain offset/limit is used. `key(row)`
+    returns the (sort value, id) of a fetched row for building next_cursor.
+    Returns (rows, next_cursor); next_cursor is None on the last page. Rows of
+    a single-entity select are the entities themselves, as with Query.
+    """
+    single_key = sort_col is id_col
+    if sort_dir == "desc":
+        order = [id_col.desc()] if single_key else [sort_col.desc(), id_col.desc()]
+    else:
+        order = [id_col.asc()] if single_key else [sort_col.asc(), id_col.asc()]
+    stmt = stmt.order_by(*order)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, sort_dir)
+        if single_key:
+            after = id_col < last_id if sort_dir == "desc" else id_col > last_id
+        else:
+            row, bound = tuple_(sort_col, id_col), tuple_(value, last_id)
+            after = row < bound if sort_dir == "desc" else row > bound
+        stmt = stmt.where(after)
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    # one extra row tells us whether another page exists
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    if len(stmt.column_descriptions) == 1:
+        rows = [row[0] for row in rows]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_by, sort_dir, *key(rows[-1]))
+    return rows, next_cursor
@@ -0,0 +1,148 @@
+"""
+Idempotent add/remove of a per-user reaction row (Like, SavedRecipe) together
+with the recipe's denormalized counter, in one transaction and as few
+round-trips as the dialect allows:
+
+    INSERT ... SELECT ... FROM recipes WHERE id = :rid ON CONFLICT DO NOTHING RETURNING id
+    UPDATE recipes SET <counter> = <counter> + 1 WHERE id = :rid RETURNING <counter>
+    COMMIT
+
+The INSERT only produces a row when the recipe exists and the reaction is new,
+so the counter moves exactly once per real change even under concurrent taps.
+Dialects without ON CONFLICT/RETURNING fall back to a SAVEPOINT-guarded insert.
+
+With the SQLite production profile the same statements run as a job on the
+single writer thread (backend.core.sqlite_writer), which group-commits many
+reactions per fsync instead of one COMMIT per request.
+"""
+from typing import Literal, Type
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, literal, select, update
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import database
+from backend.models.recipes import Recipe
+
+Counter = Literal["likes_count", "saves_count"]
+
+
+def _recipe_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+
+
+def _upsert_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _insert_reaction(insert, model: Type, user_id: int, recipe_id: int):
+    # the SELECT doubles as the existence check; created_at is filled by the column default
+    source = select(literal(user_id), Recipe.id).where(Recipe.id == recipe_id)
+    return (
+        insert(model)
+        .from_select(["user_id", "recipe_id"], source)
+        .on_conflict_do_nothing(index_elements=["user_id", "recipe_id"])
+        .returning(model.id)
+    )
+
+
+def _counter_update(recipe_id: int, counter: Counter, delta: int):
+    col = getattr(Recipe, counter)
+    return update(Recipe).where(Recipe.id == recipe_id).values({col: col + delta})
+
+
+async def _shift_counter(db: AsyncSession, recipe_id: int, counter: Counter, delta: int) -> int | None:
+    """Apply `delta` (0 = just read) and return the new value, or None if the recipe is gone."""
+    col = getattr(Recipe, counter)
+    if delta == 0:
+        return await db.scalar(select(col).where(Recipe.id == recipe_id))
+
+    stmt = _counter_update(recipe_id, counter, delta)
+    if db.get_bind().dialect.update_returning:
+        return (await db.execute(stmt.returning(col), execution_options={"synchronize_session": False})).scalar()
+    await db.execute(stmt, execution_options={"synchronize_session": False})
+    return await db.scalar(select(col).where(Recipe.id == recipe_id))
+
+
+async def add_reaction(db: AsyncSession, model: Type, counter: Counter, user_id: int, recipe_id: int) -> tuple[bool, int]:
+    """Returns (created, new counter value). Raises 404 if the recipe does not exist."""
+    writer = database.get_sqlite_writer()
+    if writer is not None:
+        return await writer.run(_add_on_writer, model, counter, user_id, recipe_id)
+
+    dialect = db.get_bind().dialect
+    insert = _upsert_insert(dialect.name)
+
+    if insert is not None and dialect.insert_returning:
+        created = (await db.execute(_insert_reaction(insert, model, user_id, recipe_id))).first() is not None
+    else:
+        if not await db.scalar(select(exists().where(Recipe.id == recipe_id))):
+            raise _recipe_not_found()
+        try:
+            async with db.begin_nested():
+                db.add(model(user_id=user_id, recipe_id=recipe_id))
+            created = True
+        except IntegrityError:
+            created = False
+
+    count = await _shift_counter(db, recipe_id, counter, 1 if created else 0)
+    if count is None:
+        await db.rollback()
+        raise _recipe_not_found()
+    await db.commit()
+    return created, count
+
+
+async def remove_reaction(db: AsyncSession, model: Type, counter: Counter, user_id: int, recipe_id: int) -> tuple[bool, int]:
+    """Returns (removed, new counter value). Raises 404 if the recipe does not exist."""
+    writer = database.get_sqlite_writer()
+    if writer is not None:
+        return await writer.run(_remove_on_writer, model, counter, user_id, recipe_id)
+
+    stmt = delete(model).where(model.user_id == user_id, model.recipe_id == recipe_id)
+
+    if db.get_bind().dialect.delete_returning:
+        removed = (await db.execute(stmt.returning(model.id), execution_options={"synchronize_session": False})).first() is not None
+    else:
+        removed = (await db.execute(stmt, execution_options={"synchronize_session": False})).rowcount > 0
+
+    count = await _shift_counter(db, recipe_id, counter, -1 if removed else 0)
+    if count is None:
+        await db.rollback()
+        raise _recipe_not_found()
+    await db.commit()
+    return removed, count
+
+
+# Writer-thread jobs (SQLite only, so ON CONFLICT and RETURNING are always there).
+# Raising inside a job rolls back just that job's SAVEPOINT.
+
+def _shift_counter_on(conn: Connection, recipe_id: int, counter: Counter, delta: int) -> int:
+    col = getattr(Recipe, counter)
+    if delta == 0:
+        count = conn.scalar(select(col).where(Recipe.id == recipe_id))
+    else:
+        count = conn.scalar(_counter_update(recipe_id, counter, delta).returning(col))
+    if count is None:
+        raise _recipe_not_found()
+    return count
+
+
+def _add_on_writer(conn: Connection, model: Type, counter: Counter, user_id: int, recipe_id: int) -> tuple[bool, int]:
+    created = conn.execute(_insert_reaction(sqlite.insert, model, user_id, recipe_id)).first() is not None
+    return created, _shift_counter_on(conn, recipe_id, counter, 1 if created else 0)
+
+
+def _remove_on_writer(conn: Connection, model: Type, counter: Counter, user_id: int, recipe_id: int) -> tuple[bool, int]:
+    stmt = delete(model).where(model.user_id == user_id, model.recipe_id == recipe_id).returning(model.id)
+    removed = conn.execute(stmt).first() is not None
+    return removed, _shift_counter_on(conn, recipe_id, counter, -1 if removed else 0)
@@ -1,115 +1,273 @@
-from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import or_, func
-from fastapi import FastAPI, HTTPException, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import or_, func, select, update, literal, union_all
+from fastapi import HTTPException, status
 from backend.models.recipes import Recipe
-from typing import Optional, Literal
+from typing import Optional, Literal, Iterable
 from datetime import datetime
-from backend.models.tags import Tag
+from backend.models.tags import Tag, recipe_tags
+from backend.models.likes import Like
+from backend.models.saved_recipe import SavedRecipe
+from backend.crud.pagination import paginate
+from backend.crud.search import apply_recipe_search
+from backend.crud.counts import count_total, invalidate_counts, TotalMode
 
 from backend.schemas.recipes import RecipeOut
 
-def create_recipe(db: Session, author_id: int, input_title: str, input_description: Optional[str], input_ingredients: list[str], input_steps: list[str], tag_ids: list[int] = []):
+RecipeInclude = Literal["tags"]
+
+BATCH_MAX_IDS = 100
+
+def recipe_load_options(include: Iterable[RecipeInclude] = ()) -> list:
+    """
+    Loader options for Recipe queries that feed RecipeOut: the creator is always
+    serialized, tags only when the client asked for them.
+    """
+    options = [joinedload(Recipe.creator)]
+    if "tags" in include:
+        options.append(selectinload(Recipe.tags))
+    return options
+
+async def _tags_by_ids(db: AsyncSession, tag_ids: list[int]) -> list[Tag]:
+    tags = (await db.scalars(select(Tag).where(Tag.id.in_(tag_ids)))).all()
+    if len(tags) != len(set(tag_ids)):
+        raise HTTPException(status_code=404, detail="One or more tags not found")
+    return list(tags)
+
+async def create_recipe(db: AsyncSession, author_id: int, input_title: str, input_description: Optional[str], input_ingredients: list[str], input_steps: list[str], tag_ids: list[int] = []):
     new_recipe = Recipe(created_by_id = author_id, title = input_title, description = input_description, ingredients = input_ingredients, steps = input_steps)
     
     if tag_ids:
-        tags = db.query(Tag).filter(Tag.id.in_(tag_ids)).all()
-        if len(tags) != len(set(tag_ids)):
-            raise HTTPException(status_code=404, detail="One or more tags not found")
-        new_recipe.tags = tags
+        new_recipe.tags = await _tags_by_ids(db, tag_ids)
 
     db.add(new_recipe)
-    db.commit()
-    db.refresh(new_recipe)
+    await db.commit()
+    invalidate_counts("recipes")
 
-    return new_recipe
+    # reload with the creator so the response can be serialized without lazy loads
+    recipe, _, _ = await get_recipe_by_id(db, new_recipe.id, populate_existing=True)
+    return recipe
 
-def get_recipe_by_id(db: Session, id: int):
-    recipe = (
-        db.query(Recipe)
-        .options(joinedload(Recipe.creator))  
-        .get(id)
-    )
+async def get_recipe_by_id(db: AsyncSession, id: int, include: Iterable[RecipeInclude] = (), populate_existing: bool = False):
+    recipe = await db.get(Recipe, id, options=recipe_load_options(include), populate_existing=populate_existing)
     if not recipe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
-    
-    likes_count = len(recipe.likes)
-    saves_count = len(recipe.saves)
 
-    return recipe, likes_count, saves_count
+    return recipe, recipe.likes_count, recipe.saves_count
 
-def list_recipes(
-        db: Session,
+def _filter_recipes(
+        db: AsyncSession,
         q: Optional[str] = None,
         created_after: Optional[datetime] = None,
         created_before: Optional[datetime] = None,
-        sort_by: Literal["id", "title", "created_at"] = "created_at",
-        sort_dir: Literal["asc", "desc"] = "desc",
-        limit: int = 20,
-        offset: int=0,
         author_id: Optional[int] = None,
+        tag_ids: Optional[list[int]] = None,
+        tag_match: Literal["any", "all"] = "any",
         ):
-       
-    query = (db.query(Recipe).options(
-        selectinload(Recipe.likes),
-        selectinload(Recipe.saves),
-        joinedload(Recipe.creator)
-    ))
-
+    """Build the filtered recipes select shared by the listing and its facets. Returns (stmt, rank)."""
+    stmt = select(Recipe)
 
+    rank = None
     if q:
-        like = f"%{q}%"
-        query = query.filter(or_(Recipe.title.ilike(like), Recipe.description.ilike(like)))
+        stmt, rank = apply_recipe_search(db, stmt, q)
 
     if created_after:
-        query = query.filter(Recipe.created_at >= created_after)
+        stmt = stmt.where(Recipe.created_at >= created_after)
     if created_before:
-        query = query.filter(Recipe.created_at <= created_before)
+        stmt = stmt.where(Recipe.created_at <= created_before)
     if author_id is not None:
-        query = query.filter(Recipe.created_by_id == author_id)
+        stmt = stmt.where(Recipe.created_by_id == author_id)
+
+    if tag_ids:
+        wanted = set(tag_ids)
+        # served by ix_recipe_tags_tag_id_recipe_id
+        tagged = select(recipe_tags.c.recipe_id).where(recipe_tags.c.tag_id.in_(wanted))
+        if tag_match == "all":
+            tagged = tagged.group_by(recipe_tags.c.recipe_id).having(func.count() == len(wanted))
+        stmt = stmt.where(Recipe.id.in_(tagged))
+
+    return stmt, rank
+
+async def get_recipes_by_ids(db: AsyncSession, ids: list[int], include: Iterable[RecipeInclude] = ()):
+    """
+    Fetch many recipes in one query. Returns (recipes, missing_ids), with
+    recipes in the order of `ids` (duplicates collapsed; they still count
+    towards BATCH_MAX_IDS).
+    """
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return [], []
+
+    found = {r.id: r for r in await db.scalars(select(Recipe).options(*recipe_load_options(include)).where(Recipe.id.in_(ids)))}
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
+async def list_recipes(
+        db: AsyncSession,
+        q: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        sort_by: Literal["id", "title", "created_at", "likes_count", "saves_count", "relevance"] = "created_at",
+        sort_dir: Literal["asc", "desc"] = "desc",
+        limit: int = 20,
+        offset: int=0,
+        author_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "exact",
+        tag_ids: Optional[list[int]] = None,
+        tag_match: Literal["any", "all"] = "any",
+        include: Iterable[RecipeInclude] = (),
+        ):
+    """
+    Returns (items, total, next_cursor). Pass `cursor` (a previous next_cursor)
+    for keyset paging; offset is ignored then. `total_mode` picks how total is
+    computed (see crud.counts); total is None for "none".
+    `q` goes through the full-text index; sort_by="relevance" ranks by it.
+    `tag_ids` keeps recipes carrying any (or, with tag_match="all", every) listed tag.
+    `include` picks optional relationships to load (see recipe_load_options).
+    """
+    if sort_by == "relevance" and not q:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="sort_by=relevance requires q")
+
+    stmt, rank = _filter_recipes(db, q, created_after, created_before, author_id, tag_ids, tag_match)
+    stmt = stmt.options(*recipe_load_options(include))
 
-    total = query.with_entities(func.count(Recipe.id)).scalar() or 0
+    tag_key = (tuple(sorted(set(tag_ids))), tag_match) if tag_ids else None
+    total = await count_total(db, stmt, Recipe.id, total_mode, "recipes",
+                        filters=(q, created_after, created_before, author_id, tag_key))
 
-    sort_col = getattr(Recipe, sort_by)
-    if sort_dir == "desc":
-        sort_col = sort_col.desc()
-    query = query.order_by(sort_col)
+    if sort_by == "relevance":
+        rows, next_cursor = await paginate(
+            db,
+            stmt.add_columns(rank),
+            sort_col=rank,
+            id_col=Recipe.id,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            key=lambda row: (row[1], row[0].id),
+        )
+        return [recipe for recipe, _ in rows], total, next_cursor
 
-    recipes = query.offset(offset).limit(limit).all()
+    recipes, next_cursor = await paginate(
+        db,
+        stmt,
+        sort_col=getattr(Recipe, sort_by),
+        id_col=Recipe.id,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        key=lambda r: (getattr(r, sort_by), r.id),
+    )
 
-    return recipes, total
+    return recipes, total, next_cursor
+
+async def recipe_tag_facets(
+        db: AsyncSession,
+        q: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        author_id: Optional[int] = None,
+        tag_ids: Optional[list[int]] = None,
+        tag_match: Literal["any", "all"] = "any",
+        ) -> list[tuple[int, str, int]]:
+    """
+    Per-tag recipe counts over the same filter as list_recipes, as
+    (tag_id, name, count) rows, busiest tag first. One grouped query.
+    """
+    stmt, _ = _filter_recipes(db, q, created_after, created_before, author_id, tag_ids, tag_match)
+    matched = stmt.with_only_columns(Recipe.id).subquery()
 
-def update_recipe(db: Session, id: int, data: dict):
-    recipe = db.query(Recipe).filter(Recipe.id == id).first()
+    count = func.count(recipe_tags.c.recipe_id)
+    rows = await db.execute(
+        select(Tag.id, Tag.name, count)
+        .join(recipe_tags, recipe_tags.c.tag_id == Tag.id)
+        .where(recipe_tags.c.recipe_id.in_(select(matched.c.id)))
+        .group_by(Tag.id, Tag.name)
+        .order_by(count.desc(), Tag.name.asc())
+    )
+    return [tuple(r) for r in rows]
+
+async def update_recipe(db: AsyncSession, id: int, data: dict):
+    tag_ids = data.pop("tag_ids", None)
+    # replacing the collection needs the current one loaded
+    options = [selectinload(Recipe.tags)] if tag_ids is not None else []
+    recipe = await db.scalar(select(Recipe).where(Recipe.id == id).options(*options))
     if not recipe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
     
-    tag_ids = data.pop("tag_ids", None)
     if tag_ids is not None:
-        tags = db.query(Tag).filter(Tag.id.in_(tag_ids)).all()
-        if len(tags) != len(set(tag_ids)):
-            raise HTTPException(status_code=404, detail="One or more tags not found")
-        recipe.tags = tags
+        recipe.tags = await _tags_by_ids(db, tag_ids)
     
     for field, value in data.items():
         if hasattr(recipe, field) and value is not None:
             setattr(recipe, field, value)
 
     db.add(recipe)
-    db.commit()
-    db.refresh(recipe)
+    await db.commit()
 
+    recipe, _, _ = await get_recipe_by_id(db, id, populate_existing=True)
     return recipe
     
-def delete_recipe(db: Session, id: int):
-    recipe = db.query(Recipe).filter(Recipe.id == id).first()
+async def delete_recipe(db: AsyncSession, id: int):
+    recipe = await db.get(Recipe, id)
 
     if not recipe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
     
-    db.delete(recipe)
-    db.commit()
+    saver_ids = (await db.scalars(select(SavedRecipe.user_id).where(SavedRecipe.recipe_id == id))).all()
+    await db.delete(recipe)
+    await db.commit()
+
+    invalidate_counts("recipes")
+    for user_id in saver_ids:
+        invalidate_counts(f"saves:{user_id}")
 
     return recipe
 
 
+async def get_viewer_flags(db: AsyncSession, user_id: int, recipe_ids: Iterable[int]) -> tuple[set[int], set[int]]:
+    """
+    Which of `recipe_ids` the user has liked and saved, as (liked_ids, saved_ids).
+    One round-trip: a UNION ALL of two IN (...) lookups on the (user_id, recipe_id) unique indexes.
+    """
+    ids = list(set(recipe_ids))
+    if not ids:
+        return set(), set()
 
+    liked = select(literal("like").label("kind"), Like.recipe_id).where(Like.user_id == user_id, Like.recipe_id.in_(ids))
+    saved = select(literal("save").label("kind"), SavedRecipe.recipe_id).where(SavedRecipe.user_id == user_id, SavedRecipe.recipe_id.in_(ids))
+
+    liked_ids, saved_ids = set(), set()
+    for kind, recipe_id in await db.execute(union_all(liked, saved)):
+        (liked_ids if kind == "like" else saved_ids).add(recipe_id)
+    return liked_ids, saved_ids
+
+async def release_counters_for_user(db: AsyncSession, user_id: int) -> None:
+    """Decrement counters on every recipe the user liked/saved, before their rows cascade away."""
+    liked = select(Like.recipe_id).where(Like.user_id == user_id)
+    saved = select(SavedRecipe.recipe_id).where(SavedRecipe.user_id == user_id)
+    await db.execute(update(Recipe).where(Recipe.id.in_(liked)).values(likes_count=Recipe.likes_count - 1))
+    await db.execute(update(Recipe).where(Recipe.id.in_(saved)).values(saves_count=Recipe.saves_count - 1))
+
+async def reconcile_counters(db: AsyncSession) -> int:
+    """
+    Rebuild likes_count/saves_count from the likes and saved_recipes tables.
+    Returns how many recipes had drifted.
+    """
+    likes_q = select(func.count(Like.id)).where(Like.recipe_id == Recipe.id).scalar_subquery()
+    saves_q = select(func.count(SavedRecipe.id)).where(SavedRecipe.recipe_id == Recipe.id).scalar_subquery()
+
+    result = await db.execute(
+        update(Recipe)
+        .where(or_(Recipe.likes_count != likes_q, Recipe.saves_count != saves_q))
+        .values(likes_count=likes_q, saves_count=saves_q)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
@@ -1,56 +1,73 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, exists, select
 from fastapi import HTTPException, status
+from typing import Iterable, Literal
 
 from backend.models.saved_recipe import SavedRecipe
 from backend.models.user import User
 from backend.models.recipes import Recipe
+from backend.crud.recipes import recipe_load_options, RecipeInclude
+from backend.crud.reactions import add_reaction, remove_reaction
+from backend.crud.pagination import paginate
+from backend.crud.counts import count_total, invalidate_counts, TotalMode
 
-def _ensure_user_exists(db: Session, user_id: int) -> None:
-    if not db.get(User, user_id):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+async def add_save(db: AsyncSession, user_id: int, recipe_id: int) -> tuple[bool, int]:
+    """Idempotent. Returns (created, saves_count); 404 if the recipe does not exist."""
+    created, count = await add_reaction(db, SavedRecipe, "saves_count", user_id, recipe_id)
+    if created:
+        invalidate_counts(f"saves:{user_id}")
+    return created, count
 
-def _ensure_recipe_exists(db: Session, recipe_id: int) -> None:
-    if not db.get(Recipe, recipe_id):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+async def remove_save(db: AsyncSession, user_id: int, recipe_id: int) -> tuple[bool, int]:
+    """Idempotent: removing a missing save is a no-op. Returns (removed, saves_count)."""
+    removed, count = await remove_reaction(db, SavedRecipe, "saves_count", user_id, recipe_id)
+    if removed:
+        invalidate_counts(f"saves:{user_id}")
+    return removed, count
 
-def add_save(db: Session, user_id: int, recipe_id: int):
-    _ensure_user_exists(db, user_id)
-    _ensure_recipe_exists(db, recipe_id)
 
-    existing = (db.query(SavedRecipe).filter(SavedRecipe.user_id == user_id, SavedRecipe.recipe_id == recipe_id).first())
-    if existing:
-        return existing
-    
-    saved_recipe = SavedRecipe(user_id = user_id, recipe_id = recipe_id)
-    db.add(saved_recipe)
-    db.commit()
-    db.refresh(saved_recipe)
+async def list_saved_recipes_for_user(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+        total_mode: TotalMode = "exact",
+        include: Iterable[RecipeInclude] = (),
+        sort_by: Literal["saved_at", "id"] = "saved_at",
+    ):
+    """
+    Most recently saved first. Returns ([(recipe, saved_at), ...], total, next_cursor).
+    Creators (and tags, if included) are loaded with the page, counts come from
+    the recipe columns, so the page costs a fixed number of queries.
+    """
+    stmt = (
+        select(Recipe, SavedRecipe.created_at, SavedRecipe.id)
+        .join(SavedRecipe, SavedRecipe.recipe_id == Recipe.id)
+        .where(SavedRecipe.user_id == user_id)
+        .options(*recipe_load_options(include))
+    )
+    # filtered by user: estimates must EXPLAIN this query, not report the whole table's size
+    total = await count_total(
+        db, stmt, SavedRecipe.id, total_mode, f"saves:{user_id}", filters=(user_id,), cache_exact=True
+    )
 
-    return saved_recipe
+    # (user_id, created_at, id) / (user_id, id) indexes serve either order
+    sort_col = SavedRecipe.created_at if sort_by == "saved_at" else SavedRecipe.id
+    rows, next_cursor = await paginate(
+        db,
+        stmt,
+        sort_col=sort_col,
+        id_col=SavedRecipe.id,
+        sort_by=sort_by,
+        sort_dir="desc",
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        key=lambda row: (row[1] if sort_by == "saved_at" else row[2], row[2]),
+    )
+    return [(recipe, saved_at) for recipe, saved_at, _ in rows], total, next_cursor
 
-def remove_save(db: Session, user_id: int, recipe_id: int):
-    _ensure_user_exists(db, user_id)
-    _ensure_recipe_exists(db, recipe_id)
 
-    saved = (db.query(SavedRecipe).filter(SavedRecipe.user_id == user_id, SavedRecipe.recipe_id == recipe_id).first())
-    if not saved:
-        return False
-    
-    db.delete(saved)
-    db.commit()
-    return True
-
-
-def list_saved_recipes_for_user(db: Session, user_id: int, limit: int = 20, offset: int = 0):
-    _ensure_user_exists(db, user_id)
-
-    total = (db.query(func.count(SavedRecipe.id)).filter(SavedRecipe.user_id == user_id).scalar() or 0)
-    q = (db.query(Recipe).join(SavedRecipe, SavedRecipe.recipe_id == Recipe.id).filter(SavedRecipe.user_id == user_id).order_by(SavedRecipe.id.desc()).offset(offset).limit(limit))
-
-    recipes = q.all()
-    return recipes, total
-
-
-def is_saved(db: Session, user_id: int, recipe_id: int):
-    return db.query(exists().where(and_(SavedRecipe.user_id == user_id, SavedRecipe.recipe_id == recipe_id))).scalar()
+async def is_saved(db: AsyncSession, user_id: int, recipe_id: int):
+    return await db.scalar(select(exists().where(and_(SavedRecipe.user_id == user_id, SavedRecipe.recipe_id == recipe_id))))
@@ -0,0 +1,45 @@
+import re
+
+from sqlalchemy import Float, Integer, Select, false, func, literal, literal_column, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.recipes import Recipe
+from backend.models.search import FTS_TABLE, TS_CONFIG
+
+
+def _fts5_query(q: str) -> str | None:
+    """Turn free text into a safe FTS5 query: every word quoted, prefix-matched and ANDed."""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def apply_recipe_search(db: AsyncSession, stmt: Select, q: str):
+    """
+    Restrict `stmt` to recipes matching `q` using the dialect's full-text index.
+    Returns (stmt, relevance) where a larger relevance is a better match.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        tsq = func.websearch_to_tsquery(TS_CONFIG, q)
+        vector = literal_column("recipes.search_vector")
+        return stmt.where(vector.op("@@")(tsq)), func.ts_rank_cd(vector, tsq)
+
+    if dialect == "sqlite":
+        match = _fts5_query(q)
+        if match is None:
+            return stmt.where(false()), literal(0.0)
+        # bm25() is "lower is better", flip it so every backend ranks descending
+        fts = (
+            text(f"SELECT rowid AS recipe_id, -bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")
+            .bindparams(match=match)
+            .columns(recipe_id=Integer, rank=Float)
+            .subquery("fts")
+        )
+        return stmt.join(fts, fts.c.recipe_id == Recipe.id), fts.c.rank
+
+    # no index available: fall back to substring matching, unranked
+    like = f"%{q}%"
+    return stmt.where(or_(Recipe.title.ilike(like), Recipe.description.ilike(like))), literal(0.0)
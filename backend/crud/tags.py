@@ -1,41 +1,42 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from backend.models.tags import Tag
 
-def list_tags(db: Session):
-    return db.query(Tag).order_by(Tag.name.asc()).all()
+async def list_tags(db: AsyncSession):
+    return (await db.scalars(select(Tag).order_by(Tag.name.asc()))).all()
 
-def get_tag_by_id(db: Session, tag_id: int) -> Tag:
-    tag = db.get(Tag, tag_id)
+async def get_tag_by_id(db: AsyncSession, tag_id: int) -> Tag:
+    tag = await db.get(Tag, tag_id)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
     return tag
 
-def create_tag(db: Session, name: str) -> Tag:
+async def create_tag(db: AsyncSession, name: str) -> Tag:
     tag = Tag(name=name.strip())
     db.add(tag)
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Tag name already exists")
-    db.refresh(tag)
+    await db.refresh(tag)
     return tag
 
-def update_tag(db: Session, tag_id: int, name: str | None) -> Tag:
-    tag = get_tag_by_id(db, tag_id)
+async def update_tag(db: AsyncSession, tag_id: int, name: str | None) -> Tag:
+    tag = await get_tag_by_id(db, tag_id)
     if name:
         tag.name = name.strip()
         try:
-            db.commit()
+            await db.commit()
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=400, detail="Tag name already exists")
-        db.refresh(tag)
+        await db.refresh(tag)
     return tag
 
-def delete_tag(db: Session, tag_id: int) -> None:
-    tag = get_tag_by_id(db, tag_id)
-    db.delete(tag)
-    db.commit()
+async def delete_tag(db: AsyncSession, tag_id: int) -> None:
+    tag = await get_tag_by_id(db, tag_id)
+    await db.delete(tag)
+    await db.commit()
@@ -1,67 +1,81 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from fastapi import FastAPI, HTTPException, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from fastapi import HTTPException, status
 from backend.models.user import User
+from backend.models.recipes import Recipe
+from backend.models.saved_recipe import SavedRecipe
 from backend.core.security import hash_password
+from backend.crud.recipes import release_counters_for_user
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, Literal
 from datetime import datetime
+from backend.crud.pagination import paginate
+from backend.crud.counts import count_total, invalidate_counts, TotalMode
 
-def get_user_by_id(db: Session, id: int):
-    user = db.get(User, id)
+async def get_user_by_id(db: AsyncSession, id: int):
+    user = await db.get(User, id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
-def get_user_by_email(db: Session, email: str):
-    user = db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
-def get_user_by_username(db: Session, username: str):
-    user = db.query(User).filter(User.username == username).first()
+async def get_user_by_username(db: AsyncSession, username: str):
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
-def list_users(
-        db: Session, 
+async def list_users(
+        db: AsyncSession, 
         q: Optional[str] = None, 
         created_after: Optional[datetime] = None, 
         created_before: Optional[datetime] = None, 
         sort_by: Literal["id", "username", "email", "created_at"] = "created_at",
         sort_dir: Literal["asc", "desc"] = "desc",
         limit: int = 20,
-        offset: int=0
+        offset: int=0,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "exact",
     ):
     """
-    Returns (items, total) for paginated user listing with optional filters.
+    Returns (items, total, next_cursor) for paginated user listing with optional filters.
+    Pass `cursor` for keyset paging; offset is ignored then. total is None for total_mode="none".
     """
-    query = db.query(User)
+    stmt = select(User)
 
     if q:
         like = f"{q}%"
-        query = query.filter(or_(User.username.ilike(like), User.email.ilike(like)))
+        stmt = stmt.where(or_(User.username.ilike(like), User.email.ilike(like)))
 
     if created_after:
-        query = query.filter(User.created_at >= created_after)
+        stmt = stmt.where(User.created_at >= created_after)
     if created_before:
-        query = query.filter(User.created_at <= created_before)
-
-    total = query.with_entities(func.count(User.id)).scalar() or 0
-
-    sort_col = getattr(User, sort_by)
-    if sort_dir == "desc":
-        sort_col = sort_col.desc()
-    query = query.order_by(sort_col)
-
-    users = query.offset(offset).limit(limit).all()
-
-    return users, total
-
-def update_user(db: Session, user_id: int, data: dict):
-    user = db.get(User, user_id)
+        stmt = stmt.where(User.created_at <= created_before)
+
+    total = await count_total(db, stmt, User.id, total_mode, "users", filters=(q, created_after, created_before))
+
+    users, next_cursor = await paginate(
+        db,
+        stmt,
+        sort_col=getattr(User, sort_by),
+        id_col=User.id,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        key=lambda u: (getattr(u, sort_by), u.id),
+    )
+
+    return users, total, next_cursor
+
+async def update_user(db: AsyncSession, user_id: int, data: dict):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -70,7 +84,7 @@ def update_user(db: Session, user_id: int, data: dict):
     new_password = data.get("password")
 
     if new_username is not None and new_username != user.username:
-        exists = (db.query(User).filter(User.username == new_username, User.id != user_id).first())
+        exists = await db.scalar(select(User.id).where(User.username == new_username, User.id != user_id))
         if exists:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already taken")
         user.username = new_username
@@ -78,31 +92,44 @@ def update_user(db: Session, user_id: int, data: dict):
     if new_email is not None:
         email_norm = new_email.strip().lower()
         if email_norm != user.email:
-            exists = (db.query(User).filter(User.email == email_norm, User.id != user_id).first())
+            exists = await db.scalar(select(User.id).where(User.email == email_norm, User.id != user_id))
             if exists:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already in use")
             user.email = email_norm
 
     if new_password:
-        user.hashed_password = hash_password(new_password)
+        user.hashed_password = await hash_password(new_password)
 
     try:
         db.add(user)
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Unique constraint failed for username or email")
     
-    db.refresh(user)
+    await db.refresh(user)
     return user
 
-def delete_user(db: Session, id: int):
-    user = db.get(User, id)
+async def delete_user(db: AsyncSession, id: int):
+    user = await db.get(User, id)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    db.delete(user)
-    db.commit()
+    # the user's recipes cascade away, taking other users' saves of them along
+    saver_ids = (await db.scalars(
+        select(SavedRecipe.user_id).distinct()
+        .join(Recipe, Recipe.id == SavedRecipe.recipe_id)
+        .where(Recipe.created_by_id == id)
+    )).all()
+    await release_counters_for_user(db, id)
+    await db.delete(user)
+    await db.commit()
+
+    invalidate_counts("users")
+    invalidate_counts("recipes")
+    invalidate_counts(f"saves:{id}")
+    for user_id in saver_ids:
+        invalidate_counts(f"saves:{user_id}")
 
     return None
\ No newline at end of file
@@ -1,21 +1,232 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from http.cookies import SimpleCookie
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, Request
+from starlette.datastructures import MutableHeaders
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 from dotenv import load_dotenv
 
+from backend.core.config import settings
+from backend.core.metrics import registry
+from backend.core.sqlite_writer import SQLiteWriter
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL is None:
     raise ValueError("DATABASE_URL is not set in environment")
-engine = create_engine(DATABASE_URL)
 
+pool_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+pool_overflow_total = registry.counter("db_pool_overflow_total", "Connections opened beyond pool_size")
+pool_timeout_total = registry.counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout")
+
+
+class _PoolInstrumentation:
+    """Records checkout wait time, overflow connections and timeouts."""
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_timeout_total.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - started)
+        if self.overflow() > max(overflow_before, 0):
+            pool_overflow_total.inc()
+        return conn
+
+
+class InstrumentedQueuePool(_PoolInstrumentation, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_PoolInstrumentation, AsyncAdaptedQueuePool):
+    pass
+
+
+def async_url(url: str) -> URL:
+    """DATABASE_URL with its async driver: asyncpg for PostgreSQL, aiosqlite for SQLite."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg")
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite")
+    return parsed
+
+
+def engine_options(url: str, *, asyncio: bool = False) -> dict:
+    """Pool settings from core.config; in-memory SQLite keeps SQLAlchemy's single-connection pool."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+
+# the application runs on the async engine, so a request waiting on the DB doesn't pin a thread
+engine = create_async_engine(async_url(DATABASE_URL), **engine_options(DATABASE_URL, asyncio=True))
+
+registry.gauge("db_pool_checked_out", "Connections currently checked out",
+               fn=lambda: engine.pool.checkedout() if isinstance(engine.pool, QueuePool) else 0)
+registry.gauge("db_pool_overflow", "Current overflow (negative = idle capacity left in pool_size)",
+               fn=lambda: engine.pool.overflow() if isinstance(engine.pool, QueuePool) else 0)
+
+
+def sqlite_profile_enabled(url: str) -> bool:
+    parsed = make_url(url)
+    return (
+        settings.SQLITE_PRODUCTION
+        and parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+    )
+
+
+def apply_sqlite_pragmas(dbapi_conn, _record=None) -> None:
+    """
+    `connect` hook for the SQLite production profile. WAL lets readers run
+    alongside the writer; synchronous=NORMAL is durable across app crashes in
+    WAL mode (only an OS crash can lose the last commits); busy_timeout makes
+    a blocked writer wait instead of failing with "database is locked".
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KIB)}")  # negative = KiB
+    cursor.close()
+
+
+if sqlite_profile_enabled(DATABASE_URL):
+    event.listen(engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+
+_sqlite_writer: SQLiteWriter | None = None
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+def get_sqlite_writer() -> SQLiteWriter | None:
+    """The process's single SQLite writer, or None when the production profile is off."""
+    global _sqlite_writer
+    if _sqlite_writer is None and sqlite_profile_enabled(DATABASE_URL):
+        _sqlite_writer = SQLiteWriter(
+            DATABASE_URL,
+            max_batch=settings.SQLITE_WRITER_MAX_BATCH,
+            max_wait=settings.SQLITE_WRITER_MAX_WAIT_MS / 1000,
+            connect_hook=apply_sqlite_pragmas,
+        )
+    return _sqlite_writer
 
-def get_db():
-    db = SessionLocal()
+
+def shutdown_sqlite_writer() -> None:
+    global _sqlite_writer
+    writer, _sqlite_writer = _sqlite_writer, None
+    if writer is not None:
+        writer.close()
+
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit reload
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
+
+
+# Read replicas. Mutations always go to the primary (get_db); GET routes take get_read_db,
+# which round-robins the replicas unless the client wrote within READ_YOUR_WRITES_SECONDS
+# (tracked by the STICKY_COOKIE that StickyPrimaryMiddleware sets on successful writes).
+replica_engines = [
+    create_async_engine(async_url(url), **engine_options(url, asyncio=True))
+    for url in settings.DATABASE_REPLICA_URLS
+]
+replica_sessionmakers = [
+    async_sessionmaker(bind=e, autoflush=False, expire_on_commit=False) for e in replica_engines
+]
+_replica_turn = itertools.count()
+
+STICKY_COOKIE = "fg_primary_until"
+_MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
     try:
+        return float(request.cookies.get(STICKY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_db)):
+    """Session for read-only routes: a replica, or the primary for clients that just wrote."""
+    if not replica_sessionmakers or reads_pinned_to_primary(request):
+        yield primary
+        return
+    make_session = replica_sessionmakers[next(_replica_turn) % len(replica_sessionmakers)]
+    async with make_session() as db:
         yield db
-    finally:
-        db.close()
+
+
+def _sticky_cookie() -> str:
+    window = settings.READ_YOUR_WRITES_SECONDS
+    cookie = SimpleCookie()
+    cookie[STICKY_COOKIE] = str(int(time.time()) + window)
+    cookie[STICKY_COOKIE]["max-age"] = window
+    cookie[STICKY_COOKIE]["path"] = "/"
+    cookie[STICKY_COOKIE]["httponly"] = True
+    cookie[STICKY_COOKIE]["samesite"] = "lax"
+    return cookie.output(header="").strip()
+
+
+class StickyPrimaryMiddleware:
+    """Plain ASGI: the cookie is added to a successful write's response headers as they go out."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in _MUTATING_METHODS
+            or settings.READ_YOUR_WRITES_SECONDS <= 0
+            or not replica_sessionmakers  # no replicas: every read already goes to the primary
+        ):
+            return await self.app(scope, receive, send)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", _sticky_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+_sync_engine: Engine | None = None
+
+def get_sync_engine() -> Engine:
+    """Blocking engine for CLI tools and schema management, created on first use."""
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+        if sqlite_profile_enabled(DATABASE_URL):
+            event.listen(_sync_engine, "connect", apply_sqlite_pragmas)
+    return _sync_engine
@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routers import auth
 import backend.models
-from backend.models.base import Base
-from backend.database import engine
+from backend.migrations import check_schema_version
+from backend.core.query_stats import QueryStatsMiddleware
+from backend.core.config import settings
+from backend.core.security import shutdown_password_pool
+from backend.core.http_metrics import HTTPMetricsMiddleware
+from backend.database import engine, shutdown_sqlite_writer, StickyPrimaryMiddleware
 from backend.models import user, recipes, likes, saved_recipe
-from backend.routers import auth, users, recipes, likes, saves, tags, health
+from backend.routers import auth, users, recipes, likes, saves, tags, health, metrics, profiles
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # schema changes are applied by `python -m backend.manage migrate`, not by every worker on boot
+    await check_schema_version(engine)
+    yield
+    shutdown_password_pool()
+    shutdown_sqlite_writer()
+    await engine.dispose()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Foodgram API")
+app = FastAPI(title="Foodgram API", lifespan=lifespan)
 
 #Allowed origins
 origins = [
@@ -20,6 +35,11 @@ origins = [
     # "https://foodgram.example.com",  #add production domain(s) here
 ]
 
+# pins a client's reads to the primary for a few seconds after it writes (see database.get_read_db)
+app.add_middleware(StickyPrimaryMiddleware)
+# statement count / DB time per request, reported as Server-Timing
+app.add_middleware(QueryStatsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,       # safe list, not "*"
@@ -28,8 +48,12 @@ app.add_middleware(
     allow_headers=["*"],         # allow all headers (Authorization, Content-Type, etc.)
 )
 
-def on_startup():
-    Base.metadata.create_all(bind=engine)
+if settings.PROFILER_ENABLED:
+    # admin-only, per request on demand (see routers.profiles)
+    app.add_middleware(profiles.ProfilingMiddleware)
+
+# outermost, so the latency histogram covers every other middleware too
+app.add_middleware(HTTPMetricsMiddleware)
 
 # Routers
 app.include_router(auth.router)
@@ -38,4 +62,6 @@ app.include_router(recipes.router)
 app.include_router(likes.router)
 app.include_router(saves.router)
 app.include_router(tags.router)
-app.include_router(health.router)
\ No newline at end of file
+app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(profiles.router)
\ No newline at end of file
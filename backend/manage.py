@@ -0,0 +1,173 @@
+"""
+Management commands.
+
+    python -m backend.manage migrate [--to N]
+    python -m backend.manage reconcile-counters
+    python -m backend.manage rebuild-search-index
+    python -m backend.manage calibrate-password-hash [--target-ms 250]
+    python -m backend.manage seed [--users N] [--recipes N] [--seed N] ...
+"""
+import argparse
+import asyncio
+import time
+
+from backend.database import SessionLocal, get_sync_engine
+from backend.crud.recipes import reconcile_counters
+from backend.models.search import ensure_search_index
+from backend.core.config import settings
+from backend.migrations import HEAD, current_version, migrate
+from backend.seed import SeedPlan, seed
+
+
+def cmd_migrate(args: argparse.Namespace) -> None:
+    engine = get_sync_engine()
+    applied = migrate(engine, target=args.to)
+    for migration in applied:
+        print(f"  applied {migration.version:04d}_{migration.name}")
+    with engine.connect() as conn:
+        print(f"Schema at version {current_version(conn)} (head {HEAD})")
+
+
+async def _reconcile_counters() -> int:
+    async with SessionLocal() as db:
+        return await reconcile_counters(db)
+
+
+def cmd_reconcile_counters(args: argparse.Namespace) -> None:
+    fixed = asyncio.run(_reconcile_counters())
+    print(f"Reconciled like/save counters: {fixed} recipe(s) updated")
+
+
+def cmd_rebuild_search_index(args: argparse.Namespace) -> None:
+    engine = get_sync_engine()
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+    print(f"Search index ready ({engine.dialect.name})")
+
+
+def _time_hash(handler, samples: int) -> float:
+    """Median wall time of one hash, in milliseconds."""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def _calibrate_bcrypt(target_ms: float, samples: int) -> int:
+    from passlib.hash import bcrypt
+
+    # 10 is the floor we'll recommend even on hosts too slow to meet the budget
+    best = 10
+    for rounds in range(10, 20):
+        ms = _time_hash(bcrypt.using(rounds=rounds), samples)
+        print(f"  bcrypt rounds={rounds}: {ms:.0f} ms")
+        if ms > target_ms:
+            break
+        best = rounds
+    return best
+
+
+def _calibrate_argon2(target_ms: float, samples: int) -> int | None:
+    from passlib.hash import argon2
+    try:
+        argon2.get_backend()
+    except Exception:
+        print("  argon2: no backend installed (pip install argon2-cffi), skipped")
+        return None
+
+    best = 1
+    for time_cost in range(1, 11):
+        handler = argon2.using(
+            time_cost=time_cost,
+            memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+            parallelism=settings.ARGON2_PARALLELISM,
+        )
+        ms = _time_hash(handler, samples)
+        print(f"  argon2 time_cost={time_cost} memory={settings.ARGON2_MEMORY_COST_KIB}KiB: {ms:.0f} ms")
+        if ms > target_ms:
+            break
+        best = time_cost
+    return best
+
+
+def cmd_calibrate_password_hash(args: argparse.Namespace) -> None:
+    schemes = [s.strip() for s in settings.PASSWORD_SCHEMES.split(",") if s.strip()]
+    print(f"Benchmarking password hashing against a {args.target_ms:.0f} ms budget")
+    recommended = {"BCRYPT_ROUNDS": _calibrate_bcrypt(args.target_ms, args.samples)}
+    if "argon2" in schemes or args.argon2:
+        time_cost = _calibrate_argon2(args.target_ms, args.samples)
+        if time_cost is not None:
+            recommended["ARGON2_TIME_COST"] = time_cost
+
+    print("Recommended settings (highest cost within budget):")
+    for name, value in recommended.items():
+        print(f"  {name}={value}")
+
+
+def cmd_seed(args: argparse.Namespace) -> None:
+    from backend.core.security import pwd_context
+
+    engine = get_sync_engine()
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version < HEAD:
+        raise SystemExit(f"Schema is at version {version}, head is {HEAD}: run `python -m backend.manage migrate` first")
+
+    plan = SeedPlan(
+        users=args.users,
+        recipes=args.recipes,
+        tags=args.tags,
+        likes_per_user=args.likes_per_user,
+        saves_per_user=args.saves_per_user,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        password=args.password,
+    )
+    print(f"Seeding {engine.dialect.name} with {plan.users} users and {plan.recipes} recipes (seed {plan.seed})")
+    started = time.perf_counter()
+    # one hash for everybody: hashing millions of passwords would take days
+    counts = seed(engine, plan, pwd_context.hash(plan.password), progress=print)
+    for table, n in counts.items():
+        print(f"  {table}: {n} rows")
+    print(f"Done in {time.perf_counter() - started:.1f}s; every seeded user's password is {plan.password!r}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.manage", description="Foodgram management commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate", help="Apply pending schema migrations")
+    p.add_argument("--to", type=int, default=None, help="stop at this version (default: latest)")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("reconcile-counters", help="Rebuild recipes.likes_count/saves_count from likes and saved_recipes")
+    p.set_defaults(func=cmd_reconcile_counters)
+
+    p = sub.add_parser("rebuild-search-index", help="Install and rebuild the recipe full-text index")
+    p.set_defaults(func=cmd_rebuild_search_index)
+
+    p = sub.add_parser("calibrate-password-hash", help="Benchmark password hashing on this host and recommend cost settings")
+    p.add_argument("--target-ms", type=float, default=250.0, help="latency budget for one hash (default: 250)")
+    p.add_argument("--samples", type=int, default=3, help="hashes timed per setting (default: 3)")
+    p.add_argument("--argon2", action="store_true", help="also benchmark argon2 even if PASSWORD_SCHEMES doesn't list it")
+    p.set_defaults(func=cmd_calibrate_password_hash)
+
+    p = sub.add_parser("seed", help="Bulk-insert a deterministic synthetic dataset for scale testing")
+    p.add_argument("--users", type=int, default=SeedPlan.users)
+    p.add_argument("--recipes", type=int, default=SeedPlan.recipes)
+    p.add_argument("--tags", type=int, default=SeedPlan.tags)
+    p.add_argument("--likes-per-user", type=float, default=SeedPlan.likes_per_user, help="mean; the spread is heavy-tailed")
+    p.add_argument("--saves-per-user", type=float, default=SeedPlan.saves_per_user, help="mean; the spread is heavy-tailed")
+    p.add_argument("--seed", type=int, default=SeedPlan.seed, help="same seed, same data")
+    p.add_argument("--batch-size", type=int, default=SeedPlan.batch_size, help="rows per transaction")
+    p.add_argument("--password", default=SeedPlan.password, help="password of every seeded user")
+    p.set_defaults(func=cmd_seed)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Baseline: the schema as it stood when migrations were introduced.
+
+Tables are spelled out here rather than taken from the models so this
+migration keeps producing the same schema as the models move on.
+
+On a database created by the old startup `create_all`, this only creates the
+tables that are missing: `create_all` never touches a table that exists, so
+columns and indexes added to existing tables since (the recipe counters and
+the listing indexes) are still absent afterwards. 0003 adds them.
+"""
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, UniqueConstraint, func,
+)
+from sqlalchemy.engine import Connection
+
+from backend.models.search import ensure_search_index
+from backend.models.types import JSONAuto
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("username", String(50), unique=True, nullable=False),
+    Column("email", String(255), unique=True, nullable=False),
+    Column("hashed_password", String(256), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("is_admin", Boolean, nullable=False),
+    Column("bio", Text, nullable=True),
+    Column("avatar_url", String(512), nullable=True),
+)
+
+Table(
+    "recipes", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(200), index=True, nullable=False),
+    Column("description", Text),
+    Column("ingredients", JSONAuto, nullable=False),
+    Column("steps", JSONAuto, nullable=False),
+    Column("created_by_id", ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("likes_count", Integer, server_default="0", nullable=False),
+    Column("saves_count", Integer, server_default="0", nullable=False),
+    Index("ix_recipes_likes_count_id", "likes_count", "id"),
+    Index("ix_recipes_saves_count_id", "saves_count", "id"),
+)
+
+Table(
+    "tags", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50), unique=True, index=True, nullable=False),
+)
+
+Table(
+    "recipe_tags", metadata,
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    UniqueConstraint("recipe_id", "tag_id", name="uq_recipe_tag"),
+    Index("ix_recipe_tags_tag_id_recipe_id", "tag_id", "recipe_id"),
+)
+
+Table(
+    "likes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False),
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE"), index=True, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    UniqueConstraint("user_id", "recipe_id", name="uq_like_user_recipe"),
+)
+
+Table(
+    "saved_recipes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False),
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE"), index=True, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    UniqueConstraint("user_id", "recipe_id", name="uq_saved_user_recipe"),
+    Index("ix_saved_recipes_user_id_id", "user_id", "id"),
+    Index("ix_saved_recipes_user_id_created_at_id", "user_id", "created_at", "id"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn)
+    ensure_search_index(conn)
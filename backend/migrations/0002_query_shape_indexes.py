@@ -0,0 +1,30 @@
+"""
+Composite indexes for the listing query shapes, and drop of the single-column
+indexes they make redundant (each is a leading prefix of a composite or
+unique index, so keeping them only costs writes).
+
+    recipes  ORDER BY created_at DESC, id DESC                     -> (created_at, id)
+    recipes  WHERE created_by_id = ? ORDER BY created_at, id       -> (created_by_id, created_at, id)
+    users    ORDER BY created_at DESC, id DESC                     -> (created_at, id)
+
+On a large PostgreSQL table, create these by hand with CREATE INDEX
+CONCURRENTLY first; the IF NOT EXISTS below then skips them.
+"""
+from sqlalchemy.engine import Connection
+
+CREATE = [
+    "CREATE INDEX IF NOT EXISTS ix_recipes_created_at_id ON recipes (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_recipes_created_by_id_created_at_id ON recipes (created_by_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)",
+]
+
+DROP = [
+    "DROP INDEX IF EXISTS ix_recipes_created_by_id",      # -> ix_recipes_created_by_id_created_at_id
+    "DROP INDEX IF EXISTS ix_likes_user_id",              # -> uq_like_user_recipe
+    "DROP INDEX IF EXISTS ix_saved_recipes_user_id",      # -> uq_saved_user_recipe, ix_saved_recipes_user_id_*
+]
+
+
+def upgrade(conn: Connection) -> None:
+    for stmt in CREATE + DROP:
+        conn.exec_driver_sql(stmt)
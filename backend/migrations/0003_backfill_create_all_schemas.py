@@ -0,0 +1,60 @@
+"""
+Bring databases that predate migrations up to the 0001 schema.
+
+Those were built by the old startup `create_all`, which created missing
+tables but never altered existing ones. So 0001 stamped them without the
+recipe counter columns or the indexes added alongside them, and listing
+recipes fails there. This adds whatever is missing, fills the counters from
+the likes and saved_recipes rows, and leaves a database that already has
+everything (any database created by 0001) untouched.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+COLUMNS = {
+    "recipes": {
+        "likes_count": "INTEGER DEFAULT 0 NOT NULL",
+        "saves_count": "INTEGER DEFAULT 0 NOT NULL",
+    },
+}
+
+# spelled out rather than reusing crud.recipes.reconcile_counters, so this migration stays frozen
+FILL_COUNTERS = """
+    UPDATE recipes SET
+        likes_count = (SELECT count(*) FROM likes WHERE likes.recipe_id = recipes.id),
+        saves_count = (SELECT count(*) FROM saved_recipes WHERE saved_recipes.recipe_id = recipes.id)
+"""
+
+INDEXES = {
+    "recipes": {
+        "ix_recipes_likes_count_id": ("likes_count", "id"),
+        "ix_recipes_saves_count_id": ("saves_count", "id"),
+    },
+    "recipe_tags": {
+        "ix_recipe_tags_tag_id_recipe_id": ("tag_id", "recipe_id"),
+    },
+    "saved_recipes": {
+        "ix_saved_recipes_user_id_id": ("user_id", "id"),
+        "ix_saved_recipes_user_id_created_at_id": ("user_id", "created_at", "id"),
+    },
+}
+
+
+def upgrade(conn: Connection) -> None:
+    insp = inspect(conn)
+
+    added = False
+    for table, columns in COLUMNS.items():
+        existing = {c["name"] for c in insp.get_columns(table)}
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+                added = True
+    if added:
+        conn.exec_driver_sql(FILL_COUNTERS)
+
+    for table, indexes in INDEXES.items():
+        existing = {i["name"] for i in insp.get_indexes(table)}
+        for name, columns in indexes.items():
+            if name not in existing:
+                conn.exec_driver_sql(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
@@ -0,0 +1,102 @@
+"""
+Versioned schema migrations.
+
+Every `NNNN_<name>.py` module in this package defines `upgrade(conn)`.
+`migrate()` applies the ones newer than the version recorded in the
+`schema_version` table, in order, each in one transaction together with its
+version bump, so a failing migration leaves the previous version in place.
+They are run explicitly, once per deploy, before new workers start:
+
+    python -m backend.manage migrate
+
+App startup only runs `check_schema_version()`: a single SELECT, no DDL and
+no per-table existence checks. A database *ahead* of the code is accepted, so
+old workers can still restart while a rolling deploy is in progress; write
+migrations so the previous release keeps working (add, then later drop).
+
+Migrations are frozen once released: never edit one, add the next number.
+"""
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Column, Integer, MetaData, Table, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+metadata = MetaData()
+schema_version = Table("schema_version", metadata, Column("version", Integer, nullable=False))
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def discover() -> list[Migration]:
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        prefix, _, name = info.name.partition("_")
+        if not prefix.isdigit():
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        found.append(Migration(int(prefix), name, module.upgrade))
+    found.sort(key=lambda m: m.version)
+    if [m.version for m in found] != list(range(1, len(found) + 1)):
+        raise RuntimeError("migrations must be numbered 0001, 0002, ... without gaps")
+    return found
+
+
+MIGRATIONS = discover()
+HEAD = MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(conn: Connection) -> int:
+    return conn.scalar(select(schema_version.c.version)) or 0
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    if conn.execute(update(schema_version).values(version=version)).rowcount == 0:
+        conn.execute(insert(schema_version).values(version=version))
+
+
+def migrate(engine: Engine, target: int | None = None) -> list[Migration]:
+    """Upgrade to `target` (default: HEAD). Returns the migrations applied."""
+    target = HEAD if target is None else target
+    with engine.begin() as conn:
+        metadata.create_all(conn)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        with engine.begin() as conn:
+            if migration.version <= current_version(conn):
+                continue
+            migration.upgrade(conn)
+            _set_version(conn, migration.version)
+        applied.append(migration)
+    return applied
+
+
+async def check_schema_version(engine: AsyncEngine) -> int:
+    """Startup check. Raises SchemaVersionError if the database is behind this build."""
+    try:
+        async with engine.connect() as conn:
+            version = (await conn.scalar(select(schema_version.c.version))) or 0
+    except DBAPIError:
+        version = 0  # no schema_version table: never migrated
+    if version < HEAD:
+        raise SchemaVersionError(
+            f"database schema is at version {version}, this build needs {HEAD}; "
+            f"run `python -m backend.manage migrate`"
+        )
+    return version
@@ -1,4 +1,5 @@
 from . import user  # noqa: F401
 from . import recipes  # noqa: F401
 from . import likes  # noqa: F401
-from . import saved_recipe  # noqa: F401
\ No newline at end of file
+from . import saved_recipe  # noqa: F401
+from . import search  # noqa: F401
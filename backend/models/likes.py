@@ -11,11 +11,12 @@ from .base import Base
 class Like(Base):
     __tablename__ = "likes"
     __table_args__ = (
+        # also the index for "liked by this user" lookups (leading user_id, covers recipe_id)
         UniqueConstraint("user_id", "recipe_id", name="uq_like_user_recipe"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False) #user who gave like
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False) #user who gave like
     recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), index=True, nullable=False) #recipe liked
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False) #time liked
 
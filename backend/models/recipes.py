@@ -1,7 +1,8 @@
 from __future__ import annotations
 from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, ForeignKey
+from sqlalchemy import String, Text, DateTime, ForeignKey, Integer, Index
+from sqlalchemy import inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from .tags import Tag, recipe_tags
@@ -16,6 +17,14 @@ from .base import Base
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # back sort_by=likes_count|saves_count, id is the tiebreaker
+        Index("ix_recipes_likes_count_id", "likes_count", "id"),
+        Index("ix_recipes_saves_count_id", "saves_count", "id"),
+        # the default listing (newest first), and the same per author; the latter also serves created_by_id lookups
+        Index("ix_recipes_created_at_id", "created_at", "id"),
+        Index("ix_recipes_created_by_id_created_at_id", "created_by_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True) #id of each recipe 
     title: Mapped[str] = mapped_column(String(200), index=True, nullable=False) #name of recipe
@@ -24,9 +33,13 @@ class Recipe(Base):
     ingredients: Mapped[List[str]] = mapped_column(JSONAuto, default=list, nullable=False) 
     steps: Mapped[List[str]] = mapped_column(JSONAuto, default=list, nullable=False)
 
-    created_by_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False) #which user made recipe
+    created_by_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False) #which user made recipe
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False) #date created
 
+    # Denormalized counters, kept in step by crud.likes / crud.saves (rebuild with `python -m backend.manage reconcile-counters`)
+    likes_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    saves_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # Relationships
     creator: Mapped["User"] = relationship(back_populates="recipes") #user who made it
 
@@ -60,7 +73,13 @@ class Recipe(Base):
         viewonly=True,
     )
 
-    tags: Mapped[list[Tag]] = relationship("Tag", secondary=recipe_tags, back_populates="recipes", lazy="selectin")
+    # loaded only when a query asks for it (crud.recipes.recipe_load_options)
+    tags: Mapped[list[Tag]] = relationship("Tag", secondary=recipe_tags, back_populates="recipes")
+
+    @property
+    def loaded_tags(self) -> Optional[list[Tag]]:
+        """Tags if this instance was loaded with them, else None -- never triggers a lazy load."""
+        return None if "tags" in inspect(self).unloaded else self.tags
 
     def __repr__(self) -> str:
         return f"<Recipe id={self.id} title={self.title!r}>"
\ No newline at end of file
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from datetime import datetime
-from sqlalchemy import UniqueConstraint, DateTime, ForeignKey
+from sqlalchemy import UniqueConstraint, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .user import User
@@ -11,11 +11,15 @@ from .base import Base
 class SavedRecipe(Base):
     __tablename__ = "saved_recipes"
     __table_args__ = (
+        # also serves user_id lookups and saved-by-user existence checks
         UniqueConstraint("user_id", "recipe_id", name="uq_saved_user_recipe"),
+        # "my saves" listing, newest first, in either sort_by order
+        Index("ix_saved_recipes_user_id_id", "user_id", "id"),
+        Index("ix_saved_recipes_user_id_created_at_id", "user_id", "created_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), index=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
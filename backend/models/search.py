@@ -0,0 +1,72 @@
+"""
+Full-text search index over recipes.title / recipes.description.
+
+PostgreSQL: a generated `search_vector` tsvector column (title weighted above
+description) with a GIN index.
+SQLite: an FTS5 external-content table `recipes_fts` that triggers keep in step
+with `recipes`.
+
+Either way the database maintains the index itself on insert/update/delete, so
+the CRUD layer never has to remember to. The objects are created right after
+the `recipes` table; `ensure_search_index` installs them on an existing database.
+"""
+from sqlalchemy import DDL, event
+from sqlalchemy.engine import Connection
+
+from .recipes import Recipe
+
+TS_CONFIG = "english"
+FTS_TABLE = "recipes_fts"
+
+_POSTGRES_DDL = [
+    f"""
+    ALTER TABLE recipes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_recipes_search_vector ON recipes USING GIN (search_vector)",
+]
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='recipes', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE OF title, description ON recipes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+for _stmt in _POSTGRES_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+for _stmt in _SQLITE_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(Recipe.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"))
+
+
+def ensure_search_index(conn: Connection) -> None:
+    """Install (idempotently) and rebuild the search index on an existing database."""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        for stmt in _POSTGRES_DDL:
+            conn.exec_driver_sql(stmt)
+    elif dialect == "sqlite":
+        for stmt in _SQLITE_DDL:
+            conn.exec_driver_sql(stmt)
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
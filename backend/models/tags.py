@@ -2,7 +2,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import Table, Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Table, Column, Integer, String, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -17,6 +17,8 @@ recipe_tags = Table(
     Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True),
     Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
     UniqueConstraint("recipe_id", "tag_id", name="uq_recipe_tag"),
+    # tag -> recipes lookups (tag filtering, facets); the PK only covers recipe -> tags
+    Index("ix_recipe_tags_tag_id_recipe_id", "tag_id", "recipe_id"),
 )
 
 class Tag(Base):
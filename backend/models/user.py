@@ -1,5 +1,5 @@
 from typing import List, TYPE_CHECKING, Optional
-from sqlalchemy import Integer, String, DateTime, Text
+from sqlalchemy import Integer, String, DateTime, Text, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from sqlalchemy.sql import func
@@ -13,6 +13,10 @@ from .base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # admin listing, newest first
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True) #id of each user entered
     username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False) #username entered by user
@@ -2,30 +2,32 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 
 from backend.database import get_db
 from backend.models.user import User
 from backend.schemas.auth import UserCreate, UserPublic, TokenPair, TokenRefreshRequest
-from backend.core.security import hash_password, verify_password
-from backend.core.jwt import create_access_token, create_refresh_token, issue_tokens
+from backend.core.security import hash_password, verify_and_update_password
+from backend.core.jwt import create_access_token, create_refresh_token, issue_tokens, decode_claims
 from backend.core.config import settings
+from backend.crud.counts import invalidate_counts
+from backend.core.principal import Principal, principal_cache, remember_principal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 # For Swagger’s “Authorize” button
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+# Same scheme for public routes that only personalise the response when a token is sent
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)):
     email = payload.email.strip().lower()
 
-    exists = (
-        db.query(User)
-        .filter(or_(User.username == payload.username, User.email == email))
-        .first()
+    exists = await db.scalar(
+        select(User.id).where(or_(User.username == payload.username, User.email == email))
     )
     if exists:
         raise HTTPException(status_code=400, detail="Username or email already registered")
@@ -33,39 +35,39 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
     user = User(
         username=payload.username,
         email=email,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password(payload.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_counts("users")
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=TokenPair)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     # Allow username OR email in the "username" field
     identifier = form.username.strip()
-    user = (
-        db.query(User)
-        .filter(or_(User.username == identifier, User.email == identifier.lower()))
-        .first()
+    user = await db.scalar(
+        select(User).where(or_(User.username == identifier, User.email == identifier.lower()))
     )
-    if not user or not verify_password(form.password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password(form.password, user.hashed_password) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
+    if new_hash:
+        # stored hash predates the current cost settings; upgrade it while we have the password
+        user.hashed_password = new_hash
+        await db.commit()
 
     return issue_tokens(user.id)
 
 
 @router.post("/refresh", response_model=TokenPair)
-def refresh_tokens(payload: TokenRefreshRequest, db: Session = Depends(get_db)):
+async def refresh_tokens(payload: TokenRefreshRequest, db: AsyncSession = Depends(get_db)):
     try:
-        decoded: dict[str, Any] = jwt.decode(
-            payload.refresh_token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGO],
-        )
+        decoded: dict[str, Any] = decode_claims(payload.refresh_token)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
@@ -83,40 +85,73 @@ def refresh_tokens(payload: TokenRefreshRequest, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=401, detail="Invalid subject in token")
 
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
     return issue_tokens(user.id)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    creds_exc = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_access_token(token: str) -> int:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGO])
+        payload = decode_claims(token)
         if payload.get("type") != "access":
-            raise creds_exc
+            raise _credentials_exception()
         sub = payload.get("sub")
-        user_id = int(sub) if sub and str(sub).isdigit() else 0
+        return int(sub) if sub and str(sub).isdigit() else 0
     except Exception:
-        raise creds_exc
+        raise _credentials_exception()
 
-    user = db.get(User, user_id)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """
+    The caller as a cached, immutable Principal (id, username, is_admin).
+    Only a cache miss touches the users table.
+    """
+    user_id = _user_id_from_access_token(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.get(User, user_id)
+        if not user:
+            raise _credentials_exception()
+        principal = remember_principal(user)
+    return principal
+
+
+async def get_current_user_full(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+    """The caller as a freshly loaded ORM User, for routes that read or modify the full profile."""
+    user = await db.get(User, _user_id_from_access_token(token))
     if not user:
-        raise creds_exc
+        raise _credentials_exception()
+    remember_principal(user)
     return user
 
 
+async def get_optional_user_id(token: str | None = Depends(oauth2_scheme_optional)) -> int | None:
+    """
+    Viewer id for public routes: None when no bearer token is sent, 401 when one
+    is sent but invalid (so the client refreshes instead of silently going anonymous).
+    Only the token is checked -- no users query.
+    """
+    if token is None:
+        return None
+    return _user_id_from_access_token(token)
+
+
 @router.get("/me", response_model=UserPublic)
-def me(current: User = Depends(get_current_user)):
+async def me(current: User = Depends(get_current_user_full)):
     return current
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout() -> Response:
+async def logout() -> Response:
     """
     Stateless JWT logoutL nothing to revoke server-side
     """
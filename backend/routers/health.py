@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from backend.database import get_db
+from backend.core.metrics import registry
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 @router.get("")
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     # trivial DB ping
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_ok = True
     except Exception:
         db_ok = False
@@ -19,3 +20,9 @@ def health_check(db: Session = Depends(get_db)):
         "status": "ok",
         "db": db_ok,
     }
+
+
+@router.get("/metrics")
+async def metrics_snapshot():
+    """Process-local counters, gauges and latency histograms."""
+    return registry.snapshot()
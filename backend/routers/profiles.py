@@ -0,0 +1,148 @@
+"""
+Opt-in profiling of single requests, for admins.
+
+Enabled with PROFILER_ENABLED=true. Then send `X-Profile: 1` (or add `_profile=1` to the query string) together with an
+admin bearer token. The request runs under the sampling profiler with its SQL
+statements recorded. The response carries `X-Profile-Id`, and the result can be
+fetched from /admin/profiles/<id> (request, timings, SQL timeline) and
+/admin/profiles/<id>/speedscope (load it at https://www.speedscope.app).
+
+Both take 1/true/yes. Requests without either only pay for a scan of the
+headers and a substring check of the query string, which is parsed only when
+it mentions "profile".
+Non-admins asking for a profile just get their normal response.
+"""
+import threading
+import time
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from backend.core.config import settings
+from backend.core.principal import Principal, principal_cache, remember_principal
+from backend.core.profiler import ProfileStore, SamplingProfiler
+from backend.core.query_stats import track_queries
+from backend.database import SessionLocal
+from backend.models.user import User
+from backend.routers.auth import _user_id_from_access_token
+from backend.routers.users import require_admin
+from backend.schemas.profiles import ProfileDetail, ProfileSummary
+
+router = APIRouter(prefix="/admin/profiles", tags=["profiles"])
+
+store = ProfileStore(settings.PROFILE_DIR, max_files=settings.PROFILER_MAX_FILES)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "_profile"
+# cheap precheck before parsing; matches "%5Fprofile" too
+PROFILE_QUERY_NEEDLE = b"profile"
+
+# one profile at a time: a second sampler would skew both and double the overhead
+_profiling = threading.Lock()
+
+
+@router.get("", response_model=list[ProfileSummary])
+async def list_profiles(_: Principal = Depends(require_admin)):
+    return await run_in_threadpool(store.list)
+
+
+@router.get("/{profile_id}", response_model=ProfileDetail)
+async def get_profile(profile_id: str, _: Principal = Depends(require_admin)):
+    meta = await run_in_threadpool(store.get, profile_id)
+    if meta is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return meta
+
+
+@router.get("/{profile_id}/speedscope")
+async def get_profile_speedscope(profile_id: str, _: Principal = Depends(require_admin)):
+    path = store.speedscope_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+def _truthy(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def _wants_profile(scope) -> bool:
+    query = scope.get("query_string", b"")
+    if PROFILE_QUERY_NEEDLE in query and any(
+        key == PROFILE_QUERY_PARAM and _truthy(value)
+        for key, value in parse_qsl(query.decode("latin-1"), keep_blank_values=True)
+    ):
+        return True
+    return any(name == PROFILE_HEADER and _truthy(value.decode("latin-1")) for name, value in scope["headers"])
+
+
+async def _is_admin(scope) -> bool:
+    auth = next((value for name, value in scope["headers"] if name == b"authorization"), b"").decode("latin-1")
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = _user_id_from_access_token(token)
+    except HTTPException:
+        return False
+    principal: Optional[Principal] = principal_cache.get(user_id)
+    if principal is None:
+        async with SessionLocal() as db:
+            user = await db.get(User, user_id)
+        if user is None:
+            return False
+        principal = remember_principal(user)
+    return principal.is_admin
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            return await self.app(scope, receive, send)
+        if not await _is_admin(scope) or not _profiling.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _profiling.release()
+
+    async def _profile(self, scope, receive, send):
+        # the id is only known once the profile is stored, so hold the response start until then
+        held, status_code = [], None
+
+        async def capture(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            held.append(message)
+
+        profiler = SamplingProfiler(interval=settings.PROFILER_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        with track_queries(timeline=True) as sql, profiler:
+            await self.app(scope, receive, capture)
+        duration = time.perf_counter() - started
+
+        name = f"{scope['method']} {scope['path']}"
+        meta = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "samples": profiler.sample_count,
+            "sql_count": sql.count,
+            "sql_ms": round(sql.seconds * 1000, 3),
+            "sql": sql.timeline,
+        }
+        profile_id = await run_in_threadpool(store.save, meta, profiler.speedscope(name))
+
+        for message in held:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
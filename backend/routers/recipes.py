@@ -1,71 +1,113 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Literal, List
-from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
-from backend.database import get_db
-from backend.models.user import User
-from backend.schemas.recipes import RecipeCreate, RecipeOut, RecipeUpdate, RecipesPage
+from backend.database import get_db, get_read_db
+from backend.core.principal import Principal
+from backend.schemas.recipes import RecipeCreate, RecipeOut, RecipeUpdate, RecipesPageOut, RecipeFacets, RecipesBatch
+from backend.schemas.tags import TagFacet
 from backend.crud.recipes import (
     create_recipe as crud_create_recipe,
     get_recipe_by_id as crud_get_recipe_by_id,
     list_recipes as crud_list_recipes,
+    RecipeInclude,
+    recipe_tag_facets as crud_recipe_tag_facets,
+    get_viewer_flags as crud_get_viewer_flags,
+    get_recipes_by_ids as crud_get_recipes_by_ids,
+    BATCH_MAX_IDS,
     update_recipe as crud_update_recipe,
     delete_recipe as crud_delete_recipe,
 )
-from backend.routers.auth import get_current_user
+from backend.routers.auth import get_current_user, get_optional_user_id
+from backend.crud.counts import TotalMode
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
+async def attach_viewer_flags(db: AsyncSession, viewer_id: Optional[int], items: List[RecipeOut]) -> List[RecipeOut]:
+    """Fill liked_by_me/saved_by_me for a page of recipes with a single query."""
+    if viewer_id is None or not items:
+        return items
+    liked, saved = await crud_get_viewer_flags(db, viewer_id, [i.id for i in items])
+    for item in items:
+        item.liked_by_me = item.id in liked
+        item.saved_by_me = item.id in saved
+    return items
+
 @router.post("", response_model=RecipeOut, status_code=status.HTTP_201_CREATED)
-def create_recipe(
+async def create_recipe(
     payload: RecipeCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    recipe = crud_create_recipe(
+    recipe = await crud_create_recipe(
         db,
         author_id=current_user.id,
         input_title=payload.title,
         input_description=payload.description,
         input_ingredients=payload.ingredients,
         input_steps=payload.steps,
+        tag_ids=payload.tag_ids,
     )
     _ = recipe.creator  
 
     base = RecipeOut.model_validate(recipe, from_attributes=True)
     return base.model_copy(update={"likes_count": 0, "saves_count": 0})
 
+# declared before /{recipe_id} so "batch" isn't taken for an id
+@router.get("/batch", response_model=RecipesBatch)
+async def get_recipes_batch(
+    db: AsyncSession = Depends(get_read_db),
+    ids: List[str] = Query(..., description=f"Recipe ids, comma-separated and/or repeated (max {BATCH_MAX_IDS})"),
+    include: List[RecipeInclude] = Query([], description="Optional relations to embed, e.g. include=tags"),
+    viewer_id: Optional[int] = Depends(get_optional_user_id),
+):
+    """Many recipes by id in a fixed number of queries, in request order."""
+    # count before splitting or parsing anything, so an oversized list costs no more than its length
+    if len(ids) + sum(chunk.count(",") for chunk in ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    try:
+        wanted = [int(part) for chunk in ids for part in chunk.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be integers")
+
+    recipes, missing = await crud_get_recipes_by_ids(db, wanted, include=include)
+    items = [RecipeOut.model_validate(r, from_attributes=True) for r in recipes]
+    await attach_viewer_flags(db, viewer_id, items)
+    return RecipesBatch(items=items, missing=missing)
+
 @router.get("/{recipe_id}", response_model=RecipeOut)
-def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    recipe, likes_count, saves_count = crud_get_recipe_by_id(db, recipe_id)
+async def get_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    include: List[RecipeInclude] = Query([], description="Optional relations to embed, e.g. include=tags"),
+    viewer_id: Optional[int] = Depends(get_optional_user_id),
+):
+    recipe, _, _ = await crud_get_recipe_by_id(db, recipe_id, include=include)
     out = RecipeOut.model_validate(recipe, from_attributes=True)
-    # attach counts
-    out.likes_count = likes_count
-    out.saves_count = saves_count
+    await attach_viewer_flags(db, viewer_id, [out])
     return out
 
-class RecipesPageOut(BaseModel):
-    items: List[RecipeOut]
-    total: int
-    limit: int
-    offset: int
-    model_config = ConfigDict(from_attributes=True)
-
 @router.get("", response_model=RecipesPageOut)
-def list_recipes_route(
-    db: Session = Depends(get_db),
-    q: Optional[str] = Query(None),
+async def list_recipes_route(
+    db: AsyncSession = Depends(get_read_db),
+    q: Optional[str] = Query(None, description="Full-text search over title and description"),
     created_after: Optional[datetime] = Query(None),
     created_before: Optional[datetime] = Query(None),
-    sort_by: Literal["id", "title", "created_at"] = "created_at",
+    sort_by: Literal["id", "title", "created_at", "likes_count", "saves_count", "relevance"] = "created_at",
     sort_dir: Literal["asc", "desc"] = "desc",
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     author_id: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    total_mode: TotalMode = Query("exact", alias="total", description="exact | estimated | none"),
+    tag_ids: List[int] = Query([], description="Only recipes with these tags"),
+    tag_match: Literal["any", "all"] = Query("any", description="Match any or all of tag_ids"),
+    facets: Optional[Literal["tags"]] = Query(None, description="Include per-tag counts for the current filter"),
+    include: List[RecipeInclude] = Query([], description="Optional relations to embed, e.g. include=tags"),
+    viewer_id: Optional[int] = Depends(get_optional_user_id),
 ):
-    recipes, total = crud_list_recipes(
+    recipes, total, next_cursor = await crud_list_recipes(
         db=db,
         q=q,
         created_after=created_after,
@@ -75,46 +117,64 @@ def list_recipes_route(
         limit=limit,
         offset=offset,
         author_id=author_id,
+        cursor=cursor,
+        total_mode=total_mode,
+        tag_ids=tag_ids,
+        tag_match=tag_match,
+        include=include,
     )
 
-    items: List[RecipeOut] = []
-    for r in recipes:
-        out = RecipeOut.model_validate(r, from_attributes=True)
-        # counts from preloaded relationships
-        out.likes_count = len(r.likes)
-        out.saves_count = len(r.saves)
-        items.append(out)
+    # counts come straight from the denormalized columns
+    items = [RecipeOut.model_validate(r, from_attributes=True) for r in recipes]
+    await attach_viewer_flags(db, viewer_id, items)
 
-    return RecipesPageOut(items=items, total=total, limit=limit, offset=offset)
+    facets_out = None
+    if facets == "tags":
+        rows = await crud_recipe_tag_facets(
+            db,
+            q=q,
+            created_after=created_after,
+            created_before=created_before,
+            author_id=author_id,
+            tag_ids=tag_ids,
+            tag_match=tag_match,
+        )
+        facets_out = RecipeFacets(tags=[TagFacet(id=i, name=n, count=c) for i, n, c in rows])
+
+    return RecipesPageOut(
+        items=items, total=total, limit=limit, offset=offset,
+        has_more=next_cursor is not None, next_cursor=next_cursor,
+        facets=facets_out,
+    )
 
 @router.patch("/{recipe_id}", response_model=RecipeOut)
-def update_recipe_route(
+async def update_recipe_route(
     recipe_id: int,
     payload: RecipeUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    recipe, _, _ = crud_get_recipe_by_id(db, recipe_id)  # unpack tuple
+    recipe, _, _ = await crud_get_recipe_by_id(db, recipe_id)  # unpack tuple
     if recipe.created_by_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not allowed to edit this recipe")
 
     data = payload.model_dump(exclude_unset=True)
-    updated = crud_update_recipe(db, recipe_id, data)
+    updated = await crud_update_recipe(db, recipe_id, data)
 
     # return with fresh counts
-    refreshed, likes_count, saves_count = crud_get_recipe_by_id(db, recipe_id)
+    refreshed, likes_count, saves_count = await crud_get_recipe_by_id(db, recipe_id)
     base = RecipeOut.model_validate(refreshed, from_attributes=True)
     return base.model_copy(update={"likes_count": likes_count, "saves_count": saves_count})
 
 @router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_recipe_route(
+async def delete_recipe_route(
     recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    recipe, _, _ = crud_get_recipe_by_id(db, recipe_id)  # unpack tuple
+    recipe, _, _ = await crud_get_recipe_by_id(db, recipe_id)  # unpack tuple
     if recipe.created_by_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not allowed to delete this recipe")
 
-    crud_delete_recipe(db, recipe_id)
+    await crud_delete_recipe(db, recipe_id)
     return None
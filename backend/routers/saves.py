@@ -1,49 +1,66 @@
 from fastapi import APIRouter, Depends, status, Query
-from sqlalchemy.orm import Session
+from typing import Optional, List, Literal
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database import get_db
-from backend.models.user import User
+from backend.database import get_db, get_read_db
+from backend.core.principal import Principal
 from backend.routers.auth import get_current_user
 from backend.schemas.recipes import RecipeOut, RecipesPage
 from backend.schemas.saves import SaveStatus  
+from backend.crud.counts import TotalMode
 from backend.crud.saves import (
     add_save as crud_add_save,
     remove_save as crud_remove_save,
     is_saved as crud_is_saved,
     list_saved_recipes_for_user as crud_list_saved_recipes_for_user,
 )
+from backend.crud.recipes import RecipeInclude
+from backend.routers.recipes import attach_viewer_flags
 
 router = APIRouter(prefix="/recipes", tags=["saves"])
 
 @router.post("/{recipe_id}/save", response_model=SaveStatus, status_code=status.HTTP_201_CREATED)
-def save_recipe(
+async def save_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    crud_add_save(db, current_user.id, recipe_id)
-    return SaveStatus(recipe_id=recipe_id, saved=True)
+    _, saves_count = await crud_add_save(db, current_user.id, recipe_id)
+    return SaveStatus(recipe_id=recipe_id, saved=True, saves_count=saves_count)
 
 @router.delete("/{recipe_id}/save", response_model=SaveStatus, status_code=status.HTTP_200_OK)
-def unsave_recipe(
+async def unsave_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    crud_remove_save(db, current_user.id, recipe_id)
-    return SaveStatus(recipe_id=recipe_id, saved=False)
+    _, saves_count = await crud_remove_save(db, current_user.id, recipe_id)
+    return SaveStatus(recipe_id=recipe_id, saved=False, saves_count=saves_count)
 
 @router.get("/me/saves", response_model=RecipesPage)
-def list_my_saved_recipes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_my_saved_recipes(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    total_mode: TotalMode = Query("exact", alias="total", description="exact | estimated | none"),
+    include: List[RecipeInclude] = Query([], description="Optional relations to embed, e.g. include=tags"),
+    sort_by: Literal["saved_at", "id"] = "saved_at",
 ):
-    recipes, total = crud_list_saved_recipes_for_user(db, current_user.id, limit, offset)
-    items = [RecipeOut.model_validate(r, from_attributes=True) for r in recipes]
-    return RecipesPage(items=items, total=total, limit=limit, offset=offset)
+    rows, total, next_cursor = await crud_list_saved_recipes_for_user(
+        db, current_user.id, limit, offset, cursor, total_mode, include, sort_by,
+    )
+    items = [
+        RecipeOut.model_validate(recipe, from_attributes=True).model_copy(update={"saved_at": saved_at})
+        for recipe, saved_at in rows
+    ]
+    await attach_viewer_flags(db, current_user.id, items)
+    return RecipesPage(
+        items=items, total=total, limit=limit, offset=offset,
+        has_more=next_cursor is not None, next_cursor=next_cursor,
+    )
 
 @router.get("/{recipe_id}/saves/me")
-def am_i_saving(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return {"recipe_id": recipe_id, "saved": crud_is_saved(db, current_user.id, recipe_id)}
+async def am_i_saving(recipe_id: int, db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user)):
+    return {"recipe_id": recipe_id, "saved": await crud_is_saved(db, current_user.id, recipe_id)}
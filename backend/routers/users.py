@@ -1,12 +1,15 @@
 # backend/routers/users.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Literal
 
-from backend.database import get_db
+from backend.database import get_db, get_read_db
 from backend.models.user import User
 from backend.core.security import hash_password
-from backend.routers.auth import get_current_user
+from backend.routers.auth import get_current_user, get_current_user_full
+from backend.core.principal import Principal, invalidate_principal
+from backend.crud.counts import TotalMode
 
 from datetime import datetime
 
@@ -28,7 +31,7 @@ from backend.schemas.users import (
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not getattr(current_user, "is_admin", False):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
     return current_user
@@ -37,16 +40,16 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
 # Me (authenticated user)
 
 @router.get("/me", response_model=UserPrivate)
-def get_me(current_user: User = Depends(get_current_user)) -> User:
+async def get_me(current_user: User = Depends(get_current_user_full)) -> User:
     """Return the authenticated user's full profile (includes email)."""
     return current_user
 
 
 @router.patch("/me", response_model=UserPrivate)
-def update_me(
+async def update_me(
     payload: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full),
 ):
     """
     Update the authenticated user's profile.
@@ -55,7 +58,7 @@ def update_me(
     """
     # Username uniqueness
     if payload.username and payload.username != current_user.username:
-        exists = db.query(User).filter(User.username == payload.username).first()
+        exists = await db.scalar(select(User.id).where(User.username == payload.username))
         if exists:
             raise HTTPException(status_code=400, detail="Username already taken")
         current_user.username = payload.username
@@ -63,14 +66,14 @@ def update_me(
     # Email uniqueness
     if payload.email and payload.email != current_user.email:
         email_norm = payload.email.strip().lower()
-        exists = db.query(User).filter(User.email == email_norm).first()
+        exists = await db.scalar(select(User.id).where(User.email == email_norm))
         if exists:
             raise HTTPException(status_code=400, detail="Email already in use")
         current_user.email = email_norm
 
     # Password
     if payload.password:
-        current_user.hashed_password = hash_password(payload.password)
+        current_user.hashed_password = await hash_password(payload.password)
 
     # Profile fields
     if payload.bio is not None:
@@ -79,36 +82,37 @@ def update_me(
         current_user.avatar_url = payload.avatar_url
 
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_principal(current_user.id)
+    await db.refresh(current_user)
     return current_user
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-def delete_me(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def delete_me(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Delete the authenticated user's account."""
-    db.delete(current_user)
-    db.commit()
+    await crud_delete_user(db, current_user.id)
+    invalidate_principal(current_user.id)
     return None
 
 
 # Public profile
 
 @router.get("/{user_id}/public", response_model=UserOut, summary="Public user profile")
-def get_user_by_id_public(user_id: int, db: Session = Depends(get_db)):
-    user = crud_get_user_by_id(db, user_id)
+async def get_user_by_id_public(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    user = await crud_get_user_by_id(db, user_id)
     return user
 
 
 # Admin
 
 @router.get("", response_model=UsersPage, summary="(admin) List users (paginated)")
-def list_users_route(
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+async def list_users_route(
+    db: AsyncSession = Depends(get_read_db),
+    _: Principal = Depends(require_admin),
     q: Optional[str] = Query(None, description="Search username/email"),
     created_after: Optional[datetime] = Query(None),
     created_before: Optional[datetime] = Query(None),
@@ -116,8 +120,10 @@ def list_users_route(
     sort_dir: Literal["asc", "desc"] = "desc",
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    total_mode: TotalMode = Query("exact", alias="total", description="exact | estimated | none"),
 ):
-    users, total = crud_list_users(
+    users, total, next_cursor = await crud_list_users(
         db=db,
         q=q,
         created_after=created_after,
@@ -126,12 +132,16 @@ def list_users_route(
         sort_dir=sort_dir,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        total_mode=total_mode,
     )
     return UsersPage(
         items=[UserOut.model_validate(u, from_attributes=True) for u in users],
         total=total,
         limit=limit,
         offset=offset,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
     )
 
 
@@ -140,14 +150,16 @@ def list_users_route(
     response_model=UserOut,
     summary="(admin) Update a user by id",
 )
-def admin_update_user(
+async def admin_update_user(
     user_id: int,
     payload: UserUpdate,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+    _: Principal = Depends(require_admin),
 ):
     data = payload.model_dump(exclude_unset=True)
-    return crud_update_user(db, user_id=user_id, data=data)
+    user = await crud_update_user(db, user_id=user_id, data=data)
+    invalidate_principal(user_id)
+    return user
 
 
 @router.delete(
@@ -155,10 +167,11 @@ def admin_update_user(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="(admin) Delete a user by id",
 )
-def admin_delete_user(
+async def admin_delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+    _: Principal = Depends(require_admin),
 ):
-    crud_delete_user(db, user_id)
+    await crud_delete_user(db, user_id)
+    invalidate_principal(user_id)
     return None
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SqlStatement(BaseModel):
+    start_ms: float
+    duration_ms: float
+    statement: str
+
+class ProfileSummary(BaseModel):
+    id: str
+    created_at: str
+    method: str
+    path: str
+    query: str
+    status: Optional[int] = None
+    duration_ms: float
+    samples: int
+    sql_count: int
+    sql_ms: float
+
+class ProfileDetail(ProfileSummary):
+    sql: list[SqlStatement]
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from typing import Optional, List
 from datetime import datetime
-from .tags import TagOut
+from .tags import TagOut, TagFacet
 from .users import UserOut
 
 class RecipeCreate(BaseModel):
@@ -38,17 +38,41 @@ class RecipeOut(BaseModel):
     likes_count: int = 0
     saves_count: int = 0
 
+    # when the viewer saved it; only on /recipes/me/saves
+    saved_at: Optional[datetime] = None
+
+    # viewer-specific, only filled in when the request carries a bearer token
+    liked_by_me: Optional[bool] = None
+    saved_by_me: Optional[bool] = None
+
+    # only present with include=tags; read via loaded_tags so serializing never lazy-loads
+    tags: Optional[List[TagOut]] = Field(
+        default=None,
+        validation_alias=AliasChoices("loaded_tags", "tags"),
+    )
+
     model_config = ConfigDict(
         from_attributes=True,
         populate_by_name=True,  
     )
 
+class RecipesBatch(BaseModel):
+    items: list[RecipeOut]
+    missing: list[int] = []  # requested ids that don't exist
+
+class RecipeFacets(BaseModel):
+    tags: list[TagFacet] = []
+
 class RecipesPage(BaseModel):
     items: list[RecipeOut]
-    total: int
+    total: Optional[int] = None  # None when requested with total=none
     limit: int
     offset: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
+class RecipesPageOut(RecipesPage):
+    facets: Optional[RecipeFacets] = None  # only with facets=tags
 
 
 
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class SaveStatus(BaseModel):
     recipe_id: int
     saved: bool
+    saves_count: Optional[int] = None
@@ -6,6 +6,11 @@ class TagCreate(BaseModel):
 class TagUpdate(BaseModel):
     name: str | None = None
 
+class TagFacet(BaseModel):
+    id: int
+    name: str
+    count: int
+
 class TagOut(BaseModel):
     id: int
     name: str
@@ -31,9 +31,11 @@ class UserUpdate(BaseModel):
     
 class UsersPage(BaseModel):
     items: List[UserOut]
-    total: int
+    total: Optional[int] = None  # None when requested with total=none
     limit: int
     offset: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 class UserPublicLite(BaseModel):
     '''To embed in comments/recipes'''
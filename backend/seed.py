@@ -0,0 +1,329 @@
+"""
+Synthetic dataset generator for scale testing.
+
+    python -m backend.manage seed --users 1000000 --recipes 3000000 --seed 7
+
+Rows go straight to the tables with Core bulk inserts (no ORM objects), in
+transactions of `batch_size` rows; only the rows of the batch being written
+are held as Python objects. What does grow with the dataset is the state the
+generator needs throughout: creation times, the like/save counters and the
+popularity tables, kept in compact arrays. That is about 8 bytes per user and
+40 per recipe at the peak (the likes phase), e.g. ~130 MB for 1M users and 3M
+recipes, whatever the number of likes. The same seed against the same
+starting database writes the same rows. The one exception is the password
+hash, which is salted: it is computed once and shared by every seeded user,
+whose password is `SeedPlan.password`.
+
+Shape of the data:
+  * users and recipes are spread over `days` ending at `end`, oldest first;
+  * authorship, likes, saves and tag use follow a Zipf law over a shuffled
+    popularity ranking (a few recipes get most of the likes, most get none);
+  * how many recipes a user likes or saves is Pareto distributed around
+    the requested mean;
+  * ingredient and step lists have the lengths of real recipes (~9 and ~7).
+
+Likes and saves are counted as they are generated and written to
+recipes.likes_count / saves_count at the end, so no reconcile pass is needed.
+Works on SQLite and PostgreSQL (explicit ids, sequences moved past them).
+"""
+import bisect
+import itertools
+import random
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import Table, bindparam, func, select, text, update
+from sqlalchemy.engine import Engine
+
+from backend.models.likes import Like
+from backend.models.recipes import Recipe
+from backend.models.saved_recipe import SavedRecipe
+from backend.models.tags import Tag, recipe_tags
+from backend.models.user import User
+
+TAG_NAMES = [
+    "breakfast", "lunch", "dinner", "dessert", "snack", "vegetarian", "vegan", "gluten-free", "dairy-free",
+    "quick", "one-pot", "baking", "grilling", "slow-cooker", "soup", "salad", "pasta", "rice", "noodles",
+    "chicken", "beef", "pork", "seafood", "tofu", "spicy", "comfort-food", "healthy", "low-carb", "high-protein",
+    "italian", "mexican", "indian", "thai", "japanese", "chinese", "korean", "french", "greek", "middle-eastern",
+    "holiday", "kids", "meal-prep", "budget", "brunch", "drinks",
+]
+_ADJECTIVES = [
+    "Smoky", "Crispy", "Creamy", "Spicy", "Lemony", "Garlicky", "Roasted", "Grilled", "Honey", "Herbed",
+    "Sticky", "Easy", "Weeknight", "Classic", "Rustic", "Zesty", "Golden", "Slow-Cooked", "Charred", "Sweet",
+]
+_MAINS = [
+    "Chicken", "Salmon", "Tofu", "Chickpea", "Beef", "Pork", "Shrimp", "Mushroom", "Lentil", "Halloumi",
+    "Eggplant", "Cauliflower", "Sweet Potato", "Turkey", "Lamb", "Black Bean", "Paneer", "Cod", "Spinach", "Pumpkin",
+]
+_DISHES = [
+    "Tacos", "Curry", "Stir-Fry", "Pasta", "Soup", "Salad", "Bowl", "Stew", "Skewers", "Risotto",
+    "Flatbread", "Casserole", "Noodles", "Burgers", "Sandwich", "Pie", "Fried Rice", "Wraps", "Bake", "Chili",
+]
+_INGREDIENTS = [
+    "olive oil", "butter", "garlic", "onion", "shallot", "ginger", "salt", "black pepper", "chili flakes", "cumin",
+    "paprika", "turmeric", "oregano", "thyme", "rosemary", "basil", "parsley", "cilantro", "lemon juice", "lime",
+    "soy sauce", "honey", "brown sugar", "flour", "eggs", "milk", "heavy cream", "parmesan", "feta", "yogurt",
+    "tomatoes", "bell pepper", "carrots", "celery", "potatoes", "spinach", "kale", "mushrooms", "zucchini", "peas",
+    "chicken stock", "vegetable stock", "coconut milk", "rice", "pasta", "chickpeas", "black beans", "lentils",
+    "breadcrumbs", "sesame oil", "vinegar", "mustard", "maple syrup", "cinnamon", "vanilla", "baking powder",
+]
+_AMOUNTS = ["1 tsp", "2 tsp", "1 tbsp", "2 tbsp", "1/4 cup", "1/2 cup", "1 cup", "2 cups", "1", "2", "3", "200 g", "500 g", "a pinch of"]
+_STEPS = [
+    "Preheat the oven to {n}00 degrees.", "Chop the {i} finely.", "Heat the {i} in a large pan over medium heat.",
+    "Add the {i} and cook for {n} minutes, stirring often.", "Season with {i} to taste.",
+    "Whisk the {i} together in a bowl.", "Simmer for {n}0 minutes until thickened.", "Fold in the {i}.",
+    "Bake for {n}5 minutes until golden.", "Let it rest for {n} minutes before serving.",
+    "Toss everything with the {i}.", "Garnish with {i} and serve warm.",
+]
+_BIO = ["Home cook.", "Baking every weekend.", "Plant-based eats.", "Cooking for a family of four.", None, None, None]
+
+
+@dataclass
+class SeedPlan:
+    users: int = 1000
+    recipes: int = 5000
+    tags: int = len(TAG_NAMES)
+    likes_per_user: float = 20.0
+    saves_per_user: float = 5.0
+    max_tags_per_recipe: int = 5
+    seed: int = 42
+    batch_size: int = 5000
+    password: str = "seed-password"
+    days: int = 730
+    # fixed rather than "now", so a seed always produces the same timestamps
+    end: datetime = field(default_factory=lambda: datetime(2025, 1, 1, tzinfo=timezone.utc))
+    # Zipf exponent for popularity; ~1 is typical of social "likes"
+    skew: float = 1.1
+
+
+class _BatchWriter:
+    """Buffers rows per table and inserts them, parents first, one transaction per `batch_size` rows."""
+
+    def __init__(self, engine: Engine, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.counts: Counter = Counter()
+        self._pending: dict[Table, list[dict]] = {}
+        self._size = 0
+
+    def add(self, table: Table, row: dict) -> None:
+        self._pending.setdefault(table, []).append(row)
+        self._size += 1
+        if self._size >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._size:
+            return
+        with self.engine.begin() as conn:
+            for table, rows in self._pending.items():
+                conn.execute(table.insert(), rows)
+                self.counts[table.name] += len(rows)
+        self._pending = {}
+        self._size = 0
+
+
+class _Zipf:
+    """Draws indexes 0..n-1 with P(rank r) ~ 1/r**s, over a seeded random ranking of the indexes."""
+
+    def __init__(self, rng: random.Random, n: int, s: float):
+        self.rng = rng
+        self.order = array("q", range(n))
+        rng.shuffle(self.order)
+        self.cum = array("d", itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+    def draw(self) -> int:
+        rank = bisect.bisect_left(self.cum, self.rng.random() * self.cum[-1])
+        return self.order[min(rank, len(self.order) - 1)]
+
+    def distinct(self, k: int) -> set[int]:
+        k = min(k, len(self.order))
+        picked: set[int] = set()
+        # the tail is so thin that the last few distinct draws can take long; give up rather than spin
+        for _ in range(4 * k + 10):
+            if len(picked) >= k:
+                break
+            picked.add(self.draw())
+        return picked
+
+
+def _pareto_count(rng: random.Random, mean: float, alpha: float = 1.5) -> int:
+    """A heavy-tailed non-negative count whose expected value is about `mean`."""
+    if mean <= 0:
+        return 0
+    return int(rng.paretovariate(alpha) * mean * (alpha - 1) / alpha)
+
+
+def _clamped_gauss(rng: random.Random, mu: float, sigma: float, lo: int, hi: int) -> int:
+    return max(lo, min(hi, round(rng.gauss(mu, sigma))))
+
+
+def _between(rng: random.Random, start: datetime, end: datetime) -> datetime:
+    if end <= start:
+        return start
+    return start + timedelta(seconds=rng.random() * (end - start).total_seconds())
+
+
+def _recipe_content(rng: random.Random) -> dict:
+    title = f"{rng.choice(_ADJECTIVES)} {rng.choice(_MAINS)} {rng.choice(_DISHES)}"
+    ingredients = [
+        f"{rng.choice(_AMOUNTS)} {name}"
+        for name in rng.sample(_INGREDIENTS, _clamped_gauss(rng, 9, 3, 2, 25))
+    ]
+    steps = [
+        rng.choice(_STEPS).format(i=rng.choice(_INGREDIENTS), n=rng.randint(1, 4))
+        for _ in range(_clamped_gauss(rng, 7, 3, 1, 20))
+    ]
+    description = f"{title} with {ingredients[0].split(' ', 1)[-1]}, ready in {rng.randint(2, 12) * 5} minutes."
+    return {"title": title, "description": description, "ingredients": ingredients, "steps": steps}
+
+
+def _next_id(engine: Engine, table: Table) -> int:
+    with engine.connect() as conn:
+        return (conn.scalar(select(func.max(table.c.id))) or 0) + 1
+
+
+def _ensure_tags(engine: Engine, count: int) -> list[int]:
+    names = (TAG_NAMES + [f"tag-{i}" for i in range(len(TAG_NAMES), count)])[:count]
+    tags = Tag.__table__
+    with engine.begin() as conn:
+        existing = dict(conn.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(names))).all())
+        missing = [{"name": name} for name in names if name not in existing]
+        if missing:
+            conn.execute(tags.insert(), missing)
+            existing = dict(conn.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(names))).all())
+    return [existing[name] for name in names]
+
+
+def _fix_sequences(engine: Engine, tables: list[Table]) -> None:
+    """Explicit ids don't advance PostgreSQL's serial sequences; move them past the new rows."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in tables:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), coalesce(max(id), 1)) FROM {table.name}"
+            ))
+
+
+def seed(engine: Engine, plan: SeedPlan, hashed_password: str, progress: Optional[Callable[[str], None]] = None) -> Counter:
+    """
+    Write `plan` into the database behind `engine`, next to whatever is there
+    already. Returns rows written per table.
+    """
+    rng = random.Random(plan.seed)
+    report = progress or (lambda message: None)
+    writer = _BatchWriter(engine, plan.batch_size)
+    users, recipes = User.__table__, Recipe.__table__
+    start = plan.end - timedelta(days=plan.days)
+
+    def phase(name: str, rows: Iterator[None]) -> None:
+        started = time.perf_counter()
+        for _ in rows:
+            pass
+        writer.flush()
+        report(f"  {name}: done in {time.perf_counter() - started:.1f}s")
+
+    first_user = _next_id(engine, users)
+    first_recipe = _next_id(engine, recipes)
+    span = (plan.end - start).total_seconds()
+    # creation times as seconds after `start`: 8 bytes each instead of a datetime object
+    user_created = array("d")
+    recipe_created = array("d")
+
+    def at(offset: float) -> datetime:
+        return start + timedelta(seconds=offset)
+
+    def gen_users():
+        for i in range(plan.users):
+            user_id = first_user + i
+            created = span * (i + rng.random()) / plan.users
+            user_created.append(created)
+            writer.add(users, {
+                "id": user_id,
+                "username": f"user{user_id}",
+                "email": f"user{user_id}@seed.foodgram.test",
+                "hashed_password": hashed_password,
+                "created_at": at(created),
+                "is_admin": False,
+                "bio": rng.choice(_BIO),
+                "avatar_url": None,
+            })
+            yield
+
+    phase(f"{plan.users} users", gen_users())
+
+    tag_ids = _ensure_tags(engine, plan.tags) if plan.tags else []
+    report(f"  {len(tag_ids)} tags")
+
+    def gen_recipes():
+        if not plan.users:
+            return
+        authors = _Zipf(rng, plan.users, plan.skew)
+        tag_pick = _Zipf(rng, len(tag_ids), plan.skew) if tag_ids else None
+        for i in range(plan.recipes):
+            recipe_id = first_recipe + i
+            author = authors.draw()
+            # nobody posts before signing up
+            created = max(span * (i + rng.random()) / plan.recipes, user_created[author] + 60)
+            recipe_created.append(created)
+            writer.add(recipes, {
+                "id": recipe_id,
+                "created_by_id": first_user + author,
+                "created_at": at(created),
+                "likes_count": 0,
+                "saves_count": 0,
+                **_recipe_content(rng),
+            })
+            if tag_pick is not None:
+                for tag in sorted(tag_pick.distinct(rng.randint(0, plan.max_tags_per_recipe))):
+                    writer.add(recipe_tags, {"recipe_id": recipe_id, "tag_id": tag_ids[tag]})
+            yield
+
+    phase(f"{plan.recipes} recipes", gen_recipes())
+
+    likes_count = array("q", bytes(8 * len(recipe_created)))
+    saves_count = array("q", bytes(8 * len(recipe_created)))
+
+    def gen_reactions(table: Table, per_user: float, counts: array):
+        if not recipe_created:
+            return
+        popular = _Zipf(rng, len(recipe_created), plan.skew)
+        for user in range(len(user_created)):
+            for recipe in sorted(popular.distinct(_pareto_count(rng, per_user))):
+                counts[recipe] += 1
+                writer.add(table, {
+                    "user_id": first_user + user,
+                    "recipe_id": first_recipe + recipe,
+                    "created_at": _between(rng, at(max(user_created[user], recipe_created[recipe])), plan.end),
+                })
+                yield
+
+    phase("likes", gen_reactions(Like.__table__, plan.likes_per_user, likes_count))
+    phase("saves", gen_reactions(SavedRecipe.__table__, plan.saves_per_user, saves_count))
+
+    started = time.perf_counter()
+    stmt = (
+        update(recipes)
+        .where(recipes.c.id == bindparam("recipe_id"))
+        .values(likes_count=bindparam("likes"), saves_count=bindparam("saves"))
+    )
+    touched = (
+        {"recipe_id": first_recipe + i, "likes": likes_count[i], "saves": saves_count[i]}
+        for i in range(len(recipe_created))
+        if likes_count[i] or saves_count[i]
+    )
+    updated = 0
+    while batch := list(itertools.islice(touched, plan.batch_size)):
+        with engine.begin() as conn:
+            conn.execute(stmt, batch)
+        updated += len(batch)
+    report(f"  counters for {updated} recipes: done in {time.perf_counter() - started:.1f}s")
+
+    _fix_sequences(engine, [users, recipes])
+    return writer.counts
@@ -0,0 +1,300 @@
+"""
+Latency, throughput and SQL per request for the hot API paths, compared
+against a stored baseline.
+
+    python benchmarks/bench_api.py                       # run, compare with benchmarks/baseline.json
+    python benchmarks/bench_api.py --save-baseline       # run, then make this the new baseline
+    python benchmarks/bench_api.py --only feed,detail --check   # exit 1 on a regression
+
+The app is driven in-process over ASGI (no network, no server) against a
+throwaway SQLite database filled by backend.seed, so two runs with the same
+options see the same data. Each scenario gets `--warmup` unmeasured requests,
+then `--requests` measured ones spread over `--concurrency` clients (login:
+a tenth of that, it is a deliberately slow password hash).
+
+Login runs the production hashing path: the password process pool and its
+bounded queue, sized by PASSWORD_POOL_WORKERS / PASSWORD_POOL_QUEUE as in a
+deployment. The hashing settings are recorded in the results' `meta`. A
+comparison against a baseline taken with different ones says so.
+
+Latency numbers only compare within one machine: re-record the baseline
+(--save-baseline) when the hardware changes, and keep it up to date in the
+same commit as a change that moves it on purpose. Query counts are
+deterministic, and any increase is reported.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+BASELINE = Path(__file__).resolve().with_name("baseline.json")
+SEARCH_TERMS = ["chicken", "curry", "lemon", "tofu", "soup", "spicy", "pasta", "salmon"]
+
+
+@dataclass
+class Client:
+    """One virtual user: a logged-in seeded account and its own random stream."""
+    http: httpx.AsyncClient
+    headers: dict
+    rng: random.Random
+    recipe_ids: list[int]
+    user_count: int
+    password: str
+    liked: int | None = None
+
+
+async def _feed(c: Client) -> httpx.Response:
+    return await c.http.get("/recipes", params={"limit": 20}, headers=c.headers)
+
+
+async def _feed_search(c: Client) -> httpx.Response:
+    return await c.http.get("/recipes", params={"limit": 20, "q": c.rng.choice(SEARCH_TERMS)}, headers=c.headers)
+
+
+async def _detail(c: Client) -> httpx.Response:
+    return await c.http.get(f"/recipes/{c.rng.choice(c.recipe_ids)}", headers=c.headers)
+
+
+async def _like_toggle(c: Client) -> httpx.Response:
+    # like a recipe, then unlike the same one, so the data ends where it started
+    if c.liked is None:
+        c.liked = c.rng.choice(c.recipe_ids)
+        return await c.http.post(f"/recipes/{c.liked}/like", headers=c.headers)
+    rid, c.liked = c.liked, None
+    return await c.http.delete(f"/recipes/{rid}/like", headers=c.headers)
+
+
+async def _login(c: Client) -> httpx.Response:
+    user = f"user{c.rng.randint(1, c.user_count)}"
+    return await c.http.post("/auth/login", data={"username": user, "password": c.password})
+
+
+async def _saved(c: Client) -> httpx.Response:
+    return await c.http.get("/recipes/me/saves", params={"limit": 20}, headers=c.headers)
+
+
+async def _tags(c: Client) -> httpx.Response:
+    return await c.http.get("/tags", headers=c.headers)
+
+
+# name -> (request, share of --requests)
+SCENARIOS: dict[str, tuple[Callable[[Client], Awaitable[httpx.Response]], float]] = {
+    "feed": (_feed, 1.0),
+    "feed_search": (_feed_search, 1.0),
+    "detail": (_detail, 1.0),
+    "like_toggle": (_like_toggle, 1.0),
+    "login": (_login, 0.1),
+    "saved": (_saved, 1.0),
+    "tags": (_tags, 1.0),
+}
+
+
+def _prepare_database(args) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="fg-bench-api-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+
+    from backend.core.security import pwd_context
+    from backend.database import get_sync_engine
+    from backend.migrations import migrate
+    from backend.seed import SeedPlan, seed
+
+    plan = SeedPlan(users=args.users, recipes=args.recipes, seed=args.seed)
+    engine = get_sync_engine()
+    migrate(engine)
+    started = time.perf_counter()
+    seed(engine, plan, pwd_context.hash(plan.password))
+    print(f"seeded {plan.users} users / {plan.recipes} recipes in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {"users": plan.users, "recipes": plan.recipes, "seed": plan.seed, "password": plan.password}
+
+
+def _percentile(values: list[float], p: float) -> float:
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+async def _run_scenario(name: str, clients: list[Client], total: int, warmup: int) -> dict:
+    from backend.core.query_stats import track_queries
+
+    request, _ = SCENARIOS[name]
+    latencies, queries, errors = [], [], 0
+
+    async def worker(c: Client, n: int, measure: bool) -> None:
+        nonlocal errors
+        for _ in range(n):
+            with track_queries() as stats:
+                started = time.perf_counter()
+                r = await request(c)
+                elapsed = time.perf_counter() - started
+            if r.status_code >= 400:
+                errors += 1
+            if measure:
+                latencies.append(elapsed)
+                queries.append(stats.count)
+
+    def shares(n: int) -> list[int]:
+        return [n // len(clients) + (i < n % len(clients)) for i in range(len(clients))]
+
+    await asyncio.gather(*(worker(c, n, False) for c, n in zip(clients, shares(warmup))))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(c, n, True) for c, n in zip(clients, shares(total))))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1e3, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1e3, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1e3, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1e3, 3),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+    }
+
+
+async def run(args) -> dict:
+    dataset = _prepare_database(args)
+
+    from backend.main import app
+    from backend.core.config import settings
+    from backend.database import engine, get_sync_engine, shutdown_sqlite_writer
+
+    with get_sync_engine().connect() as conn:
+        recipe_ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM recipes")]
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            clients = []
+            for i in range(args.concurrency):
+                username = f"user{i + 1}"
+                r = await http.post("/auth/login", data={"username": username, "password": dataset["password"]})
+                r.raise_for_status()
+                clients.append(Client(
+                    http=http,
+                    headers={"Authorization": f"Bearer {r.json()['access_token']}"},
+                    rng=random.Random(f"{args.seed}:{i}"),
+                    recipe_ids=recipe_ids,
+                    user_count=dataset["users"],
+                    password=dataset["password"],
+                ))
+
+            for name in args.only:
+                _, share = SCENARIOS[name]
+                total = max(args.concurrency, int(args.requests * share))
+                warmup = max(1, int(args.warmup * share))
+                results[name] = await _run_scenario(name, clients, total, warmup)
+                print(_row(name, results[name]), file=sys.stderr)
+
+    shutdown_sqlite_writer()
+    await engine.dispose()
+    del dataset["password"]
+    return {
+        "meta": {
+            "dataset": dataset,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": f"{platform.system()} {platform.machine()}",
+            "password_hashing": {
+                "schemes": settings.PASSWORD_SCHEMES,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+                "pool_workers": settings.PASSWORD_POOL_WORKERS,
+                "pool_queue": settings.PASSWORD_POOL_QUEUE,
+            },
+        },
+        "results": results,
+    }
+
+
+def _row(name: str, r: dict) -> str:
+    return (
+        f"{name:<12} {r['rps']:>8.0f} req/s   p50 {r['p50_ms']:>7.2f}  p95 {r['p95_ms']:>7.2f}  "
+        f"p99 {r['p99_ms']:>7.2f} ms   {r['queries_per_request']:>5.2f} q/req   errors {r['errors']}"
+    )
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print current vs baseline per scenario; return the regressions beyond `tolerance` (a fraction)."""
+    if current["meta"]["dataset"] != baseline["meta"]["dataset"]:
+        print("note: baseline was recorded on a different dataset, timings are not comparable")
+    if current["meta"].get("password_hashing") != baseline["meta"].get("password_hashing"):
+        print("note: baseline was recorded with different password hashing settings, login is not comparable")
+    regressions = []
+    print(f"{'scenario':<12} {'metric':<20} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<12} (not in baseline)")
+            continue
+        for metric, higher_is_better in (("rps", True), ("p50_ms", False), ("p95_ms", False), ("queries_per_request", False)):
+            old, new = before[metric], now[metric]
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            flag = ""
+            if metric == "queries_per_request":
+                if new > old:
+                    flag = "  REGRESSION"
+            elif worse > tolerance:
+                flag = "  REGRESSION"
+            if flag:
+                regressions.append(f"{name} {metric}: {old} -> {new}")
+            print(f"{name:<12} {metric:<20} {old:>10} {new:>10} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000, help="seeded users")
+    parser.add_argument("--recipes", type=int, default=10000, help="seeded recipes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="virtual clients, each a different seeded user")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="baseline JSON to compare against / save to")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--json", type=Path, help="also write this run's results here")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (default 0.2 = 20%%)")
+    parser.add_argument("--check", action="store_true", help="exit 1 if anything regressed against the baseline")
+    args = parser.parse_args()
+    args.only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in args.only if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    current = asyncio.run(run(args))
+    if args.json:
+        args.json.write_text(json.dumps(current, indent=2) + "\n")
+
+    regressions = []
+    if args.baseline.is_file() and not args.save_baseline:
+        regressions = compare(current, json.loads(args.baseline.read_text()), args.tolerance)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
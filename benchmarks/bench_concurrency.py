@@ -0,0 +1,126 @@
+"""
+Sustained throughput of hot read/write routes under high concurrency.
+
+    python benchmarks/bench_concurrency.py [--concurrency 200] [--duration 10]
+    python benchmarks/bench_concurrency.py --url http://127.0.0.1:8000 ...
+
+By default the app is driven in-process over ASGI against a throwaway SQLite
+database. With --url it hits a running server instead (e.g. uvicorn/gunicorn
+started from an older checkout with the sync stack), which is how the async
+and sync stacks are compared on equal terms. Each virtual client loops over
+a mix of list / detail / like / unlike requests (--mix writes: only like /
+unlike / save / unsave); RPS and latency percentiles are printed at the end.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+PASSWORD = "benchpass123"
+
+
+def _in_process_client() -> httpx.AsyncClient:
+    tmpdir = tempfile.mkdtemp(prefix="fg-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+    os.environ.setdefault("PASSWORD_POOL_WORKERS", "0")
+
+    from backend.main import app
+    from backend.database import get_sync_engine
+    from backend.migrations import migrate
+
+    migrate(get_sync_engine())
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def _seed(client: httpx.AsyncClient, recipes: int) -> tuple[dict, list[int]]:
+    name = f"bench{random.randrange(10**9)}"
+    await client.post("/auth/register", json={"username": name, "email": f"{name}@example.com", "password": PASSWORD})
+    r = await client.post("/auth/login", data={"username": name, "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    ids = []
+    for i in range(recipes):
+        r = await client.post("/recipes", headers=headers,
+                              json={"title": f"Bench recipe {i}", "ingredients": ["salt"], "steps": ["stir"]})
+        ids.append(r.json()["id"])
+    return headers, ids
+
+
+async def _write(client, headers, rid):
+    path = random.choice(("like", "save"))
+    if random.random() < 0.5:
+        return await client.post(f"/recipes/{rid}/{path}", headers=headers)
+    return await client.delete(f"/recipes/{rid}/{path}", headers=headers)
+
+
+async def _worker(client, headers, ids, deadline, latencies, errors, mix):
+    while time.perf_counter() < deadline:
+        rid = random.choice(ids)
+        roll = random.random()
+        started = time.perf_counter()
+        if mix == "writes":
+            r = await _write(client, headers, rid)
+        elif roll < 0.4:
+            r = await client.get("/recipes", params={"limit": 20}, headers=headers)
+        elif roll < 0.8:
+            r = await client.get(f"/recipes/{rid}", headers=headers)
+        elif roll < 0.9:
+            r = await client.post(f"/recipes/{rid}/like", headers=headers)
+        else:
+            r = await client.delete(f"/recipes/{rid}/like", headers=headers)
+        latencies.append(time.perf_counter() - started)
+        if r.status_code >= 400:
+            errors.append(r.status_code)
+
+
+async def run(args) -> None:
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60)
+    else:
+        client = _in_process_client()
+
+    async with client:
+        headers, ids = await _seed(client, args.recipes)
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            _worker(client, headers, ids, deadline, latencies, errors, args.mix) for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    if not args.url:
+        from backend.database import engine, shutdown_sqlite_writer
+        shutdown_sqlite_writer()
+        await engine.dispose()  # aiosqlite connections keep worker threads alive otherwise
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3
+    print(f"target        {args.url or 'in-process ASGI'}")
+    print(f"concurrency   {args.concurrency}   duration {elapsed:.1f}s   mix {args.mix}")
+    print(f"requests      {len(latencies)}   errors {len(errors)}")
+    print(f"throughput    {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency ms    p50 {pct(0.50):.1f}   p95 {pct(0.95):.1f}   p99 {pct(0.99):.1f}   mean {statistics.fmean(latencies) * 1e3:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--recipes", type=int, default=50, help="recipes to seed before the run")
+    parser.add_argument("--mix", choices=("mixed", "writes"), default="mixed")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-request cost of HTTPMetricsMiddleware.
+
+    python benchmarks/bench_metrics_overhead.py [--requests 50000] [--budget-us 50]
+
+Drives a minimal FastAPI app (one trivial route, no database) straight through
+its ASGI interface, with and without the middleware, and reports the
+difference per request. Exits non-zero if it exceeds --budget-us.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI  # noqa: E402
+
+from backend.core.http_metrics import HTTPMetricsMiddleware  # noqa: E402
+
+
+def _app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(HTTPMetricsMiddleware)
+    return app
+
+
+async def _drive(app, n: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/items/7", "raw_path": b"/items/7", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / n
+
+
+async def run(args) -> None:
+    plain, instrumented = _app(False), _app(True)
+    await _drive(plain, 2000)  # warm up routing / pydantic caches
+    await _drive(instrumented, 2000)
+
+    # interleave the two so drift (frequency scaling, GC) hits both equally
+    base, with_mw = [], []
+    for _ in range(args.rounds):
+        base.append(await _drive(plain, args.requests // args.rounds))
+        with_mw.append(await _drive(instrumented, args.requests // args.rounds))
+
+    b, m = statistics.median(base) * 1e6, statistics.median(with_mw) * 1e6
+    print(f"without middleware  {b:8.1f} us/request")
+    print(f"with middleware     {m:8.1f} us/request")
+    print(f"overhead            {m - b:8.1f} us/request (budget {args.budget_us:.0f})")
+    if m - b > args.budget_us:
+        raise SystemExit("over budget")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--budget-us", type=float, default=50.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
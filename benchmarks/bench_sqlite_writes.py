@@ -0,0 +1,43 @@
+"""
+Write throughput on SQLite: default settings vs the production profile
+(WAL + tuned pragmas + the group-committing single writer).
+
+    python benchmarks/bench_sqlite_writes.py [--concurrency 100] [--duration 10]
+
+Runs bench_concurrency.py with the write-only mix (like / unlike / save /
+unsave) once per profile, each in a fresh process and on a fresh database,
+since the profile is read from the environment at import time.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().with_name("bench_concurrency.py")
+
+PROFILES = {
+    "default": {"SQLITE_PRODUCTION": "false"},
+    "production": {"SQLITE_PRODUCTION": "true"},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--recipes", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, env in PROFILES.items():
+        print(f"== {name} ==", flush=True)
+        subprocess.run(
+            [sys.executable, str(BENCH), "--mix", "writes",
+             "--concurrency", str(args.concurrency), "--duration", str(args.duration), "--recipes", str(args.recipes)],
+            env={**os.environ, **env},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Worker boot cost: schema DDL on startup (the old `create_all`) vs the
+schema-version check.
+
+    python benchmarks/bench_startup.py [--workers 16] [--url postgresql://...]
+
+Starts --workers processes at once, as a process manager does on a rolling
+restart or scale-out, all against one database (a throwaway SQLite file
+unless --url is given). Each one imports the app and runs its startup step;
+the time spent in that step and the wall time until every worker is ready
+are reported for both modes. The database is migrated beforehand, so the
+DDL mode only pays for its table-existence checks, as on every real boot.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+WORKER = """
+import asyncio, json, sys, time
+mode = sys.argv[1]
+from backend.main import app, lifespan
+from backend.database import engine
+from backend.models.base import Base
+
+async def boot():
+    started = time.perf_counter()
+    if mode == "create_all":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        async with lifespan(app):
+            pass
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed
+
+print(json.dumps({"startup": asyncio.run(boot())}))
+"""
+
+
+def _run(mode: str, workers: int, env: dict) -> tuple[list[float], float]:
+    started = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WORKER, mode], cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    timings = []
+    for p in procs:
+        out, _ = p.communicate()
+        if p.returncode != 0:
+            raise SystemExit(f"worker failed in mode {mode}")
+        timings.append(json.loads(out.strip().splitlines()[-1])["startup"])
+    return timings, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--url", help="database to boot against (default: a fresh SQLite file)")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{tempfile.mkdtemp(prefix='fg-bench-')}/startup.db"
+    env = {**os.environ, "DATABASE_URL": url, "PYTHONPATH": str(ROOT)}
+    subprocess.run([sys.executable, "-m", "backend.manage", "migrate"], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+    print(f"{args.workers} workers against {url.split('@')[-1]}")
+    for mode in ("create_all", "version-check"):
+        timings, wall = _run(mode, args.workers, env)
+        print(f"  {mode:<14} startup step ms: mean {statistics.fmean(timings) * 1e3:7.1f}"
+              f"   max {max(timings) * 1e3:7.1f}   all ready in {wall:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,9 @@ export async function apiFetch(path: string, opts: Options = {}) {
   const token = getAccessToken();
   if (token) headers.set("Authorization", `Bearer ${token}`);
 
+  // Send cookies so the API can keep our reads on the primary right after a write
+  init.credentials = init.credentials ?? "include";
+
   // First attempt
   let res = await fetch(url, { ...init, headers });
 
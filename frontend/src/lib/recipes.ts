@@ -2,7 +2,7 @@ import { apiFetch } from "@/lib/api";
 import type { RecipesPage, Recipe } from "./types";
 
 /** Allowed sort fields & directions (tweak to match your backend) */
-type SortBy = "created_at" | "title" | "id";
+type SortBy = "created_at" | "title" | "id" | "likes_count" | "saves_count" | "relevance";
 type SortDir = "asc" | "desc";
 
 type ListParams = {
@@ -12,6 +12,11 @@ type ListParams = {
   sort_by?: SortBy;
   sort_dir?: SortDir;
   author_id?: number;
+  /** next_cursor from the previous page (keyset paging; overrides offset) */
+  cursor?: string;
+  tag_ids?: number[];
+  tag_match?: "any" | "all";
+  facets?: "tags";
 };
 
 // LIST
@@ -23,6 +28,10 @@ export async function fetchRecipes(params?: ListParams) {
   if (params?.sort_by) qs.set("sort_by", params.sort_by);
   if (params?.sort_dir) qs.set("sort_dir", params.sort_dir);
   if (params?.author_id != null) qs.set("author_id", String(params.author_id));
+  if (params?.cursor) qs.set("cursor", params.cursor);
+  params?.tag_ids?.forEach((id) => qs.append("tag_ids", String(id)));
+  if (params?.tag_match) qs.set("tag_match", params.tag_match);
+  if (params?.facets) qs.set("facets", params.facets);
 
 
   const res = await apiFetch(`/recipes${qs.toString() ? `?${qs.toString()}` : ""}`);
@@ -37,6 +46,13 @@ export async function fetchRecipeById(id: number) {
   return (await res.json()) as Recipe;
 }
 
+// BATCH (order-preserving; unknown ids come back in `missing`)
+export async function fetchRecipesByIds(ids: number[]) {
+  const res = await apiFetch(`/recipes/batch?ids=${ids.join(",")}`);
+  if (!res.ok) throw new Error("Failed to fetch recipes");
+  return (await res.json()) as { items: Recipe[]; missing: number[] };
+}
+
 // CREATE
 export async function createRecipe(input: {
   title: string;
@@ -115,10 +131,11 @@ export async function unsaveRecipe(id: number) {
   return r.json();
 }
 
-export async function fetchMySavedRecipes(params?: { limit?: number; offset?: number }) {
+export async function fetchMySavedRecipes(params?: { limit?: number; offset?: number; cursor?: string }) {
   const qs = new URLSearchParams();
   if (params?.limit) qs.set("limit", String(params.limit));
   if (params?.offset) qs.set("offset", String(params.offset));
+  if (params?.cursor) qs.set("cursor", params.cursor);
   const res = await apiFetch(`/recipes/me/saves${qs.toString() ? "?" + qs.toString() : ""}`);
   if (!res.ok) throw new Error("Failed to fetch saved recipes");
   return (await res.json()) as RecipesPage;
@@ -14,16 +14,26 @@ export type Recipe = {
   description?: string | null;
   ingredients: string[];
   steps: string[];
-  tags?: Tag[];
+  tags?: Tag[] | null;  // only with include=tags
   created_by: UserSummary;        
   created_at: string;             
   likes_count: number;
   saves_count: number;
+  /** only on /recipes/me/saves */
+  saved_at?: string | null;
+  /** viewer-specific; null when fetched without a token */
+  liked_by_me?: boolean | null;
+  saved_by_me?: boolean | null;
 };
 
+export type TagFacet = Tag & { count: number };
+
 export type RecipesPage = {
   items: Recipe[];
-  total: number;
+  total: number | null;
   limit: number;
   offset: number;
+  has_more?: boolean;
+  next_cursor?: string | null;
+  facets?: { tags: TagFacet[] } | null;
 };
@@ -1,4 +1,5 @@
-from tests.conftest import _register, _login, auth_headers
+import pytest
+from tests.conftest import _register, _login, auth_headers, TEST_PASSWORD
 
 def test_register_ok(client):
     r = _register(client, "user1", "user1@example.com")
@@ -58,3 +59,59 @@ def test_logout_noop(client):
     # no server state; should still return 204
     r = client.post("/auth/logout")
     assert r.status_code in (200, 204)
+
+
+def test_login_fails_fast_when_password_pool_is_full(client, monkeypatch):
+    import threading
+    from backend.core import security
+
+    _register(client, "busy", "busy@example.com")
+    full = threading.BoundedSemaphore(1)
+    full.acquire()
+    monkeypatch.setattr(security, "_slots", full)
+
+    r = _login(client, "busy@example.com")
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_outdated_password_hash(client, db_session):
+    from passlib.hash import bcrypt
+    from backend.models.user import User
+    from backend.core.config import settings
+
+    _register(client, "legacy", "legacy@example.com")
+    user = db_session.query(User).filter(User.username == "legacy").first()
+    user.hashed_password = bcrypt.using(rounds=4).hash(TEST_PASSWORD)
+    db_session.commit()
+
+    r = _login(client, "legacy@example.com")
+    assert r.status_code == 200
+    db_session.refresh(user)
+    assert bcrypt.from_string(user.hashed_password).rounds == settings.BCRYPT_ROUNDS
+
+    # the upgraded hash still verifies
+    assert _login(client, "legacy@example.com").status_code == 200
+
+
+def test_verified_tokens_are_memoized_until_exp(monkeypatch):
+    from jose import JWTError
+    from backend.core import jwt as core_jwt
+
+    core_jwt.clear_jwt_cache()
+    calls = []
+    real_decode = core_jwt.jwt.decode
+    monkeypatch.setattr(core_jwt.jwt, "decode", lambda *a, **kw: calls.append(1) or real_decode(*a, **kw))
+
+    token = core_jwt.create_access_token("42")
+    assert core_jwt.decode_claims(token)["sub"] == "42"
+    assert core_jwt.decode_claims(token)["sub"] == "42"
+    assert len(calls) == 1
+
+    # tampered and expired tokens are never served from the cache
+    with pytest.raises(JWTError):
+        core_jwt.decode_claims(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+    expired = core_jwt.create_access_token("42", expires_minutes=-1)
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            core_jwt.decode_claims(expired)
@@ -0,0 +1,160 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
+
+from backend.database import InstrumentedAsyncQueuePool, InstrumentedQueuePool, async_url, engine_options, pool_overflow_total, pool_timeout_total, pool_wait_seconds
+from tests.conftest import TEST_DATABASE_URL
+
+
+def test_engine_options_follow_settings():
+    opts = engine_options("postgresql+psycopg2://u:p@localhost/foodgram")
+    assert opts["poolclass"] is InstrumentedQueuePool
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping", "pool_use_lifo"} <= opts.keys()
+    assert engine_options("postgresql://u:p@localhost/foodgram", asyncio=True)["poolclass"] is InstrumentedAsyncQueuePool
+    # in-memory SQLite can't share a pool of connections
+    assert engine_options("sqlite://") == {}
+
+
+def test_async_url_picks_async_driver():
+    assert async_url("postgresql://u:p@localhost/foodgram").drivername == "postgresql+asyncpg"
+    assert async_url("postgresql+psycopg2://u:p@localhost/foodgram").drivername == "postgresql+asyncpg"
+    assert async_url("sqlite:///./app.db").drivername == "sqlite+aiosqlite"
+
+
+def test_instrumented_pool_records_overflow_and_timeouts(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05,
+    )
+    overflow_before = pool_overflow_total.value
+    timeouts_before = pool_timeout_total.value
+    waits_before = pool_wait_seconds.snapshot()["count"]
+
+    first, second = eng.connect(), eng.connect()
+    assert eng.pool.checkedout() == 2
+    assert pool_overflow_total.value == overflow_before + 1
+    with pytest.raises(PoolTimeoutError):
+        eng.connect()
+    assert pool_timeout_total.value == timeouts_before + 1
+    assert pool_wait_seconds.snapshot()["count"] == waits_before + 3
+
+    first.execute(text("SELECT 1"))
+    first.close()
+    second.close()
+    eng.dispose()
+
+
+def test_reads_use_replica_unless_client_just_wrote(client, user_token, monkeypatch, tmp_path):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from backend import database
+    from backend.models.base import Base
+    from tests.conftest import auth_headers
+
+    # a replica that never caught up: same schema, no rows
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    seed = create_engine(url)
+    Base.metadata.create_all(seed)
+    seed.dispose()
+    replica = create_async_engine(database.async_url(url), poolclass=NullPool)
+    monkeypatch.setattr(database, "replica_sessionmakers", [async_sessionmaker(bind=replica, expire_on_commit=False)])
+
+    r = client.post("/recipes", json={"title": "Fresh", "ingredients": [], "steps": []}, headers=auth_headers(user_token))
+    rid = r.json()["id"]
+    assert database.STICKY_COOKIE in r.cookies
+    # the writer reads its own write from the primary
+    assert client.get(f"/recipes/{rid}").status_code == 200
+
+    # other clients (or the same one after the window) read the lagging replica
+    client.cookies.clear()
+    assert client.get(f"/recipes/{rid}").status_code == 404
+    assert client.get(f"/recipes/{rid}/likes/count").status_code == 404
+
+    client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token))
+    assert client.get(f"/recipes/{rid}/likes/count").json()["count"] == 1
+
+
+def test_sticky_cookie_only_after_successful_writes(client, user_token, monkeypatch):
+    from backend import database
+    from tests.conftest import auth_headers
+
+    ok = {"title": "Ok", "ingredients": [], "steps": []}
+    # without replicas there is nothing to pin reads away from
+    r = client.post("/recipes", json=ok, headers=auth_headers(user_token))
+    assert r.status_code == 201 and database.STICKY_COOKIE not in r.cookies
+
+    monkeypatch.setattr(database, "replica_sessionmakers", [database.SessionLocal])
+    assert database.STICKY_COOKIE not in client.get("/recipes").cookies
+    r = client.post("/recipes", json={"title": "No auth", "ingredients": [], "steps": []})
+    assert r.status_code == 401
+    assert database.STICKY_COOKIE not in r.cookies
+
+    r = client.post("/recipes", json=ok, headers=auth_headers(user_token))
+    assert r.status_code == 201
+    assert "httponly" in r.headers["set-cookie"].lower()
+    assert "server-timing" in r.headers  # the other header-adding middleware still runs alongside
+
+
+def test_sqlite_profile_pragmas(tmp_path):
+    from backend.core.config import settings
+    from backend.database import apply_sqlite_pragmas
+
+    eng = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    event.listen(eng, "connect", apply_sqlite_pragmas)
+    with eng.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -settings.SQLITE_CACHE_SIZE_KIB
+    eng.dispose()
+
+
+def test_sqlite_writer_group_commits_and_isolates_failures(tmp_path):
+    from backend.core.sqlite_writer import SQLiteWriter, commits_total
+
+    url = f"sqlite:///{tmp_path / 'writer.db'}"
+    seed = create_engine(url)
+    with seed.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+
+    def put(conn, name):
+        conn.exec_driver_sql("INSERT INTO items (name) VALUES (?)", (name,))
+        return name
+
+    writer = SQLiteWriter(url, max_batch=100, max_wait=0.2)
+    commits_before = commits_total.value
+    futures = [writer.submit(put, f"item{i}") for i in range(20)]
+    futures.append(writer.submit(put, "item0"))  # violates UNIQUE: only this job is rolled back
+    assert [f.result(timeout=5) for f in futures[:-1]] == [f"item{i}" for i in range(20)]
+    with pytest.raises(IntegrityError):
+        futures[-1].result(timeout=5)
+    writer.close()
+
+    assert commits_total.value - commits_before < 21
+    with seed.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM items").scalar() == 20
+    seed.dispose()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL.startswith("sqlite"), reason="the single writer is SQLite-only")
+def test_reactions_go_through_sqlite_writer(client, user_token, bob_token, monkeypatch):
+    from backend import database
+    from backend.core.sqlite_writer import SQLiteWriter, commits_total
+    from tests.conftest import auth_headers
+
+    rid = client.post("/recipes", json={"title": "Queued", "ingredients": [], "steps": []},
+                      headers=auth_headers(user_token)).json()["id"]
+    writer = SQLiteWriter(TEST_DATABASE_URL)
+    monkeypatch.setattr(database, "_sqlite_writer", writer)
+    commits_before = commits_total.value
+    try:
+        assert client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token)).json()["likes_count"] == 1
+        assert client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token)).json()["likes_count"] == 1
+        assert client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token)).json()["likes_count"] == 2
+        assert client.delete(f"/recipes/{rid}/like", headers=auth_headers(bob_token)).json()["likes_count"] == 1
+        assert client.post(f"/recipes/{rid}/save", headers=auth_headers(bob_token)).status_code == 201
+        assert client.post("/recipes/999999/like", headers=auth_headers(user_token)).status_code == 404
+    finally:
+        writer.close()
+    assert commits_total.value > commits_before
+    assert client.get(f"/recipes/{rid}/likes/count").json()["count"] == 1
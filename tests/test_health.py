@@ -1,6 +1,87 @@
+from fastapi import Depends
+
+from tests.conftest import auth_headers
+
 def test_health_ok(client):
     r = client.get("/health")
     assert r.status_code == 200
     body = r.json()
     assert body["status"] == "ok"
     assert body["db"] is True
+
+
+def test_metrics_report_password_hashing(client):
+    from tests.conftest import _register
+    _register(client, "metric", "metric@example.com")
+    r = client.get("/health/metrics")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["password_hash_seconds"]["count"] >= 1
+    assert body["password_pool_inflight"] == 0
+
+
+def test_server_timing_reports_queries(client):
+    r = client.get("/health")
+    assert r.headers["server-timing"].startswith("db;dur=")
+    assert '"1 queries"' in r.headers["server-timing"]
+
+
+def test_fingerprint_groups_statement_shapes():
+    from backend.core.query_stats import fingerprint
+    a = fingerprint("SELECT * FROM users WHERE id = ? AND name = 'x'")
+    assert a == fingerprint("SELECT *\n  FROM users WHERE id = $1 AND name = 'it''s'")
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == fingerprint("SELECT 1 FROM t WHERE id IN (5)")
+
+
+def test_repeated_statements_are_logged(client, caplog, monkeypatch):
+    import logging
+    from sqlalchemy import text
+    from backend.core.config import settings
+    from backend.database import get_db
+    from backend.main import app
+
+    async def n_plus_one(db=Depends(get_db)):
+        for i in range(3):
+            await db.execute(text("SELECT :i"), {"i": i})
+        return {}
+
+    app.add_api_route("/__n_plus_one", n_plus_one)
+    monkeypatch.setattr(settings, "SQL_REPEAT_WARN_THRESHOLD", 3)
+    try:
+        with caplog.at_level(logging.DEBUG, logger="backend.sql"):
+            client.get("/__n_plus_one")
+    finally:
+        app.router.routes.pop()
+    assert any("possible N+1" in rec.message and "ran 3 times" in rec.message for rec in caplog.records)
+    assert any("3 queries" in rec.message for rec in caplog.records)
+
+
+def test_prometheus_metrics_endpoint(client, user_token):
+    client.get("/recipes/424242")  # 404, labelled with the route template
+    client.get("/users/me", headers=auth_headers(user_token))
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_request_duration_seconds_count{route="/recipes/{recipe_id}",method="GET",status="404"}' in text
+    assert 'http_request_duration_seconds_bucket{route="/users/me",method="GET",status="200",le="+Inf"}' in text
+    assert 'cache_hits_total{cache="principal"}' in text
+    for name in ("http_requests_in_flight", "threadpool_tasks_waiting", "db_pool_checked_out", "password_hash_seconds_count"):
+        assert f"\n{name}" in text
+
+
+def test_counters_sum_across_threads_and_render_labels():
+    import threading
+    from backend.core.metrics import MetricsRegistry
+
+    reg = MetricsRegistry()
+    hits = reg.counter("hits_total", "Hits", labels=("path",))
+    threads = [threading.Thread(target=lambda: [hits.labels('/a"b').inc() for _ in range(1000)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert hits.labels('/a"b').value == 4000
+    assert 'hits_total{path="/a\\"b"} 4000' in reg.render_prometheus()
+    assert reg.snapshot() == {"hits_total": {'path=/a"b': 4000}}
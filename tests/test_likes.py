@@ -31,3 +31,45 @@ def test_like_flow_idempotent(client, user_token):
     r6 = client.get(f"/recipes/{rid}/likes/count")
     assert r6.status_code == 200
     assert r6.json()["count"] == 0
+
+def test_like_updates_recipe_counter(client, user_token, bob_token):
+    rid = _make_recipe(client, user_token, "Counted")
+    client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token))
+    client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token))  # idempotent, no double count
+    client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token))
+    assert client.get(f"/recipes/{rid}").json()["likes_count"] == 2
+
+    client.delete(f"/recipes/{rid}/like", headers=auth_headers(bob_token))
+    client.delete(f"/recipes/{rid}/like", headers=auth_headers(bob_token))  # idempotent, no double decrement
+    assert client.get(f"/recipes/{rid}").json()["likes_count"] == 1
+
+def test_deleting_user_releases_counters(client, user_token, bob_token):
+    rid = _make_recipe(client, user_token, "Released")
+    client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token))
+    client.post(f"/recipes/{rid}/save", headers=auth_headers(bob_token))
+    client.delete("/users/me", headers=auth_headers(bob_token))
+    body = client.get(f"/recipes/{rid}").json()
+    assert body["likes_count"] == 0
+    assert body["saves_count"] == 0
+
+def test_like_returns_count_without_extra_lookup(client, user_token, bob_token):
+    rid = _make_recipe(client, user_token, "Direct")
+    assert client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token)).json()["likes_count"] == 1
+    assert client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token)).json()["likes_count"] == 2
+    assert client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token)).json()["likes_count"] == 2
+    assert client.delete(f"/recipes/{rid}/like", headers=auth_headers(bob_token)).json()["likes_count"] == 1
+    assert client.delete(f"/recipes/{rid}/like", headers=auth_headers(bob_token)).json()["likes_count"] == 1
+
+def test_like_missing_recipe_404(client, user_token):
+    assert client.post("/recipes/999999/like", headers=auth_headers(user_token)).status_code == 404
+    assert client.delete("/recipes/999999/like", headers=auth_headers(user_token)).status_code == 404
+
+def test_like_fallback_without_upsert(client, user_token, monkeypatch):
+    import backend.crud.reactions as reactions
+    monkeypatch.setattr(reactions, "_upsert_insert", lambda name: None)
+
+    rid = _make_recipe(client, user_token, "Fallback")
+    assert client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token)).json()["likes_count"] == 1
+    assert client.post(f"/recipes/{rid}/like", headers=auth_headers(user_token)).json()["likes_count"] == 1
+    assert client.get(f"/recipes/{rid}/likes/count").json()["count"] == 1
+    assert client.post("/recipes/999999/like", headers=auth_headers(user_token)).status_code == 404
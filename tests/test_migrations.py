@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, UniqueConstraint, create_engine,
+    func, inspect, insert, select,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from backend.crud.counts import clear_count_cache
+from backend.database import async_url, get_db
+from backend.main import app
+from backend.models.types import JSONAuto
+from backend.migrations import HEAD, MIGRATIONS, SchemaVersionError, check_schema_version, current_version, migrate
+from backend.models.base import Base
+from backend.models.recipes import Recipe
+
+
+def _schema(eng) -> dict:
+    insp = inspect(eng)
+    return {
+        table: (
+            {c["name"]: (str(c["type"]), c["nullable"]) for c in insp.get_columns(table)},
+            {i["name"]: (tuple(i["column_names"]), bool(i["unique"])) for i in insp.get_indexes(table)},
+        )
+        for table in insp.get_table_names()
+        if table in Base.metadata.tables
+    }
+
+
+def _check(url: str) -> int:
+    async def run():
+        eng = create_async_engine(async_url(url), poolclass=NullPool)
+        try:
+            return await check_schema_version(eng)
+        finally:
+            await eng.dispose()
+    return asyncio.run(run())
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    modelled = create_engine(f"sqlite:///{tmp_path / 'modelled.db'}")
+    assert [m.version for m in migrate(migrated)] == [m.version for m in MIGRATIONS]
+    Base.metadata.create_all(modelled)
+
+    assert _schema(migrated) == _schema(modelled)
+    with migrated.connect() as conn:
+        assert current_version(conn) == HEAD
+    assert migrate(migrated) == []  # nothing left to apply
+    migrated.dispose()
+    modelled.dispose()
+
+
+def _legacy_metadata() -> MetaData:
+    """The schema the old startup `create_all` built, before counters and listing indexes."""
+    legacy = MetaData()
+    users = Table(
+        "users", legacy,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("username", String(50), unique=True, nullable=False),
+        Column("email", String(255), unique=True, nullable=False),
+        Column("hashed_password", String(256), nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Column("is_admin", Boolean, nullable=False),
+        Column("bio", Text),
+        Column("avatar_url", String(512)),
+    )
+    Table(
+        "recipes", legacy,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String(200), index=True, nullable=False),
+        Column("description", Text),
+        Column("ingredients", JSONAuto, nullable=False),
+        Column("steps", JSONAuto, nullable=False),
+        Column("created_by_id", ForeignKey(users.c.id, ondelete="CASCADE"), index=True, nullable=False),
+        Column("created_at", DateTime(timezone=True), nullable=False),
+    )
+    for name, constraint in (("likes", "uq_like_user_recipe"), ("saved_recipes", "uq_saved_user_recipe")):
+        Table(
+            name, legacy,
+            Column("id", Integer, primary_key=True),
+            Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False),
+            Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE"), index=True, nullable=False),
+            Column("created_at", DateTime(timezone=True), nullable=False),
+            UniqueConstraint("user_id", "recipe_id", name=constraint),
+        )
+    Table(
+        "tags", legacy,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(50), unique=True, index=True, nullable=False),
+    )
+    Table(
+        "recipe_tags", legacy,
+        Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True),
+        Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+        UniqueConstraint("recipe_id", "tag_id", name="uq_recipe_tag"),
+    )
+    return legacy
+
+
+def test_existing_create_all_database_is_adopted(tmp_path):
+    path = tmp_path / "legacy.db"
+    eng = create_engine(f"sqlite:///{path}")
+    legacy = _legacy_metadata()
+    legacy.create_all(eng)
+    now = datetime(2024, 1, 1)
+    t = legacy.tables
+    with eng.begin() as conn:
+        conn.execute(insert(t["users"]), [
+            {"id": i, "username": f"u{i}", "email": f"u{i}@example.com", "hashed_password": "x", "is_admin": False}
+            for i in (1, 2)
+        ])
+        conn.execute(insert(t["recipes"]), [
+            {"id": i, "title": f"Soup {i}", "ingredients": [], "steps": [], "created_by_id": 1, "created_at": now}
+            for i in (1, 2)
+        ])
+        conn.execute(insert(t["likes"]), [{"user_id": u, "recipe_id": 1, "created_at": now} for u in (1, 2)])
+        conn.execute(insert(t["saved_recipes"]), [{"user_id": 2, "recipe_id": 2, "created_at": now}])
+
+    migrate(eng)
+    with eng.connect() as conn:
+        assert current_version(conn) == HEAD
+        counters = conn.execute(select(Recipe.id, Recipe.likes_count, Recipe.saves_count).order_by(Recipe.id)).all()
+        assert [tuple(row) for row in counters] == [(1, 2, 0), (2, 0, 1)]
+    indexes = {i["name"] for table in ("recipes", "recipe_tags", "saved_recipes") for i in inspect(eng).get_indexes(table)}
+    assert {
+        "ix_recipes_likes_count_id", "ix_recipes_saves_count_id", "ix_recipe_tags_tag_id_recipe_id",
+        "ix_saved_recipes_user_id_id", "ix_saved_recipes_user_id_created_at_id",
+    } <= indexes
+    eng.dispose()
+
+    # and the app can serve from it
+    legacy_async = create_async_engine(async_url(f"sqlite:///{path}"), poolclass=NullPool)
+    legacy_sessions = async_sessionmaker(bind=legacy_async, expire_on_commit=False)
+
+    async def _legacy_db():
+        async with legacy_sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = _legacy_db
+    clear_count_cache()
+    try:
+        with TestClient(app) as client:
+            r = client.get("/recipes", params={"sort_by": "likes_count"})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        clear_count_cache()
+        asyncio.run(legacy_async.dispose())
+    assert r.status_code == 200, r.text
+    assert [(item["id"], item["likes_count"]) for item in r.json()["items"]][:2] == [(1, 2), (2, 0)]
+
+
+def test_startup_check_requires_migrated_schema(tmp_path):
+    url = f"sqlite:///{tmp_path / 'startup.db'}"
+    with pytest.raises(SchemaVersionError, match="manage migrate"):
+        _check(url)
+
+    eng = create_engine(url)
+    migrate(eng)
+    eng.dispose()
+    assert _check(url) == HEAD
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from backend.core.profiler import ProfileStore, SamplingProfiler
+from backend.routers import profiles
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def profile_store(tmp_path, monkeypatch):
+    store = ProfileStore(str(tmp_path), max_files=3)
+    monkeypatch.setattr(profiles, "store", store)
+    return store
+
+
+def test_admin_can_profile_a_request(client, admin_token, profile_store):
+    r = client.get("/recipes", headers={**auth_headers(admin_token), "X-Profile": "1"})
+    assert r.status_code == 200
+    profile_id = r.headers["x-profile-id"]
+
+    listed = client.get("/admin/profiles", headers=auth_headers(admin_token)).json()
+    assert [p["id"] for p in listed] == [profile_id]
+
+    detail = client.get(f"/admin/profiles/{profile_id}", headers=auth_headers(admin_token)).json()
+    assert detail["method"] == "GET" and detail["path"] == "/recipes"
+    assert detail["status"] == 200
+    assert detail["sql_count"] == len(detail["sql"]) >= 1
+    assert all("statement" in s and s["start_ms"] >= 0 for s in detail["sql"])
+
+    flame = client.get(f"/admin/profiles/{profile_id}/speedscope", headers=auth_headers(admin_token)).json()
+    assert flame["profiles"][0]["type"] == "sampled"
+
+
+def test_query_flag_also_profiles(client, admin_token, profile_store):
+    r = client.get("/tags?_profile=1", headers=auth_headers(admin_token))
+    assert r.status_code == 200
+    assert "x-profile-id" in r.headers
+
+
+def test_profile_flag_must_match_exactly():
+    from backend.routers.profiles import _wants_profile
+
+    def wants(query: bytes, headers=()) -> bool:
+        return _wants_profile({"query_string": query, "headers": list(headers)})
+
+    assert wants(b"_profile=1") and wants(b"limit=5&_profile=true") and wants(b"%5Fprofile=yes")
+    assert not wants(b"my_profile=1")
+    assert not wants(b"x_profile=10")
+    assert not wants(b"q=_profile=1")
+    assert not wants(b"_profile=0") and not wants(b"")
+    assert wants(b"", [(b"x-profile", b"true")])
+    assert not wants(b"", [(b"x-profile", b"0")])
+
+
+def test_profiling_is_ignored_for_non_admins(client, user_token, profile_store):
+    r = client.get("/recipes", headers={**auth_headers(user_token), "X-Profile": "1"})
+    assert r.status_code == 200
+    assert "x-profile-id" not in r.headers
+    assert profile_store.list() == []
+
+    r = client.get("/recipes", headers={"X-Profile": "1"})
+    assert r.status_code == 200
+    assert "x-profile-id" not in r.headers
+
+
+def test_profiles_endpoints_are_admin_only(client, user_token, admin_token, profile_store):
+    assert client.get("/admin/profiles", headers=auth_headers(user_token)).status_code == 403
+    assert client.get("/admin/profiles/" + "0" * 32, headers=auth_headers(admin_token)).status_code == 404
+    assert client.get("/admin/profiles/../etc/speedscope", headers=auth_headers(admin_token)).status_code == 404
+
+
+def test_store_keeps_only_the_newest(profile_store):
+    ids = []
+    for i in range(5):
+        ids.append(profile_store.save({"path": f"/{i}"}, {}))
+        time.sleep(0.01)
+    assert [p["id"] for p in profile_store.list()] == ids[:-4:-1]
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_exports_speedscope():
+    with SamplingProfiler(interval=0.001) as profiler:
+        _busy(0.05)
+    assert profiler.sample_count > 0
+    doc = profiler.speedscope("busy")
+    frames = doc["shared"]["frames"]
+    profile = doc["profiles"][0]
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert any(frames[i]["name"] == "_busy" for stack in profile["samples"] for i in stack)
+    assert all(0 <= i < len(frames) for stack in profile["samples"] for i in stack)
@@ -0,0 +1,153 @@
+"""
+Query-plan regression suite.
+
+Each case drives real API calls and records every statement the app sends to
+the database. Each statement is EXPLAINed on the same connection, with the
+same parameters, right after it runs (SQLite: EXPLAIN QUERY PLAN; PostgreSQL:
+EXPLAIN with seq scans and sorts disabled, so a plan that still contains
+them has no index to use). A case fails if one of its statements does a full
+table scan or sorts rows in a temp B-tree, i.e. the indexes no longer match
+the query shape.
+"""
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from tests.conftest import _is_sqlite, auth_headers, engine
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT\s+INTO\s+\w+\s*\([^)]*\)\s*SELECT)", re.I | re.S)
+
+
+def _explain(dbapi_conn, statement, parameters) -> list[str]:
+    cursor = dbapi_conn.cursor()
+    try:
+        if _is_sqlite:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            return [row[3] for row in cursor.fetchall()]
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+        cursor.execute("EXPLAIN " + statement, parameters)
+        plan = [row[0] for row in cursor.fetchall()]
+        cursor.execute("RESET enable_seqscan")
+        cursor.execute("RESET enable_sort")
+        return plan
+    finally:
+        cursor.close()
+
+
+def _problems(plan: list[str], allow_sort: bool = False, allow_scan: bool = False) -> list[str]:
+    bad = []
+    for line in plan:
+        if _is_sqlite:
+            # "SCAN t" with no index is a full table scan; virtual (FTS) tables and constant rows are fine
+            if re.match(r"SCAN \w+$", line) and "CONSTANT ROW" not in line and not allow_scan:
+                bad.append(line)
+            if "USE TEMP B-TREE FOR ORDER BY" in line and not allow_sort:
+                bad.append(line)
+        elif ("Seq Scan" in line and not allow_scan) or (re.search(r"(?<!Incremental )Sort\b", line) and not allow_sort):
+            bad.append(line.strip())
+    return bad
+
+
+@contextmanager
+def recorded_plans():
+    plans: list[tuple[str, list[str]]] = []
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not _EXPLAINABLE.match(statement):
+            return
+        plans.append((statement, _explain(conn.connection.dbapi_connection, statement, parameters)))
+
+    # every engine: the app's sessions come from whichever conftest instance pytest loaded
+    event.listen(Engine, "after_cursor_execute", after)
+    try:
+        yield plans
+    finally:
+        event.remove(Engine, "after_cursor_execute", after)
+
+
+def assert_indexed(plans, allow_sort: bool = False, allow_scan: bool = False) -> None:
+    assert plans, "no statements were recorded"
+    failures = [
+        f"{statement}\n  -> {'; '.join(bad)}"
+        for statement, plan in plans
+        if (bad := _problems(plan, allow_sort, allow_scan))
+    ]
+    assert not failures, "queries without a usable index:\n" + "\n".join(failures)
+
+
+@pytest.fixture
+def world(client, user_token, bob_token, admin_token):
+    """Two users, a few tagged recipes, likes and saves."""
+    tag_ids = [client.post("/tags", json={"name": n}, headers=auth_headers(admin_token)).json()["id"] for n in ("a", "b")]
+    rids = [
+        client.post("/recipes", headers=auth_headers(user_token),
+                    json={"title": f"R{i}", "ingredients": [], "steps": [], "tag_ids": tag_ids[: i % 3]}).json()["id"]
+        for i in range(6)
+    ]
+    for rid in rids[:3]:
+        client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token))
+        client.post(f"/recipes/{rid}/save", headers=auth_headers(bob_token))
+    me = client.get("/users/me", headers=auth_headers(user_token)).json()
+    return {"user": user_token, "bob": bob_token, "admin": admin_token, "rids": rids, "tag_ids": tag_ids, "author_id": me["id"]}
+
+
+HOT_PATHS = {
+    "recipes newest first": lambda c, w: c.get("/recipes"),
+    "recipes next page": lambda c, w: c.get("/recipes", params={"cursor": c.get("/recipes", params={"limit": 2}).json()["next_cursor"], "limit": 2}),
+    "recipes by author": lambda c, w: c.get("/recipes", params={"author_id": w["author_id"]}),
+    "recipes by likes": lambda c, w: c.get("/recipes", params={"sort_by": "likes_count"}),
+    "recipes by saves": lambda c, w: c.get("/recipes", params={"sort_by": "saves_count"}),
+    "recipes by tag": lambda c, w: c.get("/recipes", params={"tag_ids": w["tag_ids"][0]}),
+    "recipes by title": lambda c, w: c.get("/recipes", params={"sort_by": "title", "sort_dir": "asc"}),
+    "recipes search": lambda c, w: c.get("/recipes", params={"q": "R1"}),
+    "recipes search by relevance": lambda c, w: c.get("/recipes", params={"q": "R1", "sort_by": "relevance"}),
+    "recipes tag facets": lambda c, w: c.get("/recipes", params={"facets": "tags"}),
+    "recipe detail": lambda c, w: c.get(f"/recipes/{w['rids'][0]}"),
+    "recipe batch": lambda c, w: c.get("/recipes/batch", params={"ids": ",".join(map(str, w["rids"]))}),
+    "likes count": lambda c, w: c.get(f"/recipes/{w['rids'][0]}/likes/count"),
+    "liked by me": lambda c, w: c.get(f"/recipes/{w['rids'][0]}/likes/me", headers=auth_headers(w["bob"])),
+    "saved by me": lambda c, w: c.get(f"/recipes/{w['rids'][0]}/saves/me", headers=auth_headers(w["bob"])),
+    "my saves": lambda c, w: c.get("/recipes/me/saves", headers=auth_headers(w["bob"])),
+    "my saves by id": lambda c, w: c.get("/recipes/me/saves", params={"sort_by": "id"}, headers=auth_headers(w["bob"])),
+    "like": lambda c, w: c.post(f"/recipes/{w['rids'][4]}/like", headers=auth_headers(w["user"])),
+    "unlike": lambda c, w: c.delete(f"/recipes/{w['rids'][0]}/like", headers=auth_headers(w["bob"])),
+    "save": lambda c, w: c.post(f"/recipes/{w['rids'][4]}/save", headers=auth_headers(w["user"])),
+    "unsave": lambda c, w: c.delete(f"/recipes/{w['rids'][0]}/save", headers=auth_headers(w["bob"])),
+    "login": lambda c, w: c.post("/auth/login", data={"username": "bob@test.com", "password": "pass12345"}),
+    "tags": lambda c, w: c.get("/tags"),
+    "admin user listing": lambda c, w: c.get("/users", headers=auth_headers(w["admin"])),
+    "admin user search": lambda c, w: c.get("/users", params={"q": "bo"}, headers=auth_headers(w["admin"])),
+}
+
+
+# Shapes that sort by design, each with the reason no index can or should serve the ORDER BY.
+SORT_ALLOWED = {
+    "recipes by tag": "driven from ix_recipe_tags_tag_id_recipe_id; sorting the matches beats walking every recipe by date",
+    "recipes search": "driven from recipes_fts, which has no date order to walk; only the matches are sorted",
+    "recipes search by relevance": "bm25 rank is computed per query, so it can only be sorted, never indexed",
+    "recipes tag facets": "tags are ordered by a per-request count, which exists only after the GROUP BY",
+}
+
+# Shapes that scan by design, with the reason.
+SCAN_ALLOWED = {
+    "admin user search": "substring LIKE '%q%' on username/email cannot use a B-tree; admin-only and users is small",
+}
+
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_queries_use_indexes(client, world, name):
+    with recorded_plans() as plans:
+        r = HOT_PATHS[name](client, world)
+    assert r.status_code < 400, r.text
+    assert_indexed(plans, allow_sort=name in SORT_ALLOWED, allow_scan=name in SCAN_ALLOWED)
+
+
+def test_detector_flags_scans_and_sorts():
+    # recipes.description has no index: the suite must notice the scan and the sort
+    with engine.connect() as conn:
+        plan = _explain(conn.connection.dbapi_connection, "SELECT id FROM recipes ORDER BY description", ())
+    assert _problems(plan)
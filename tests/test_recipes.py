@@ -1,4 +1,4 @@
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, run_async
 
 def test_create_recipe(client, user_token):
     payload = {
@@ -67,3 +67,199 @@ def test_delete_recipe_permissions(client, user_token, bob_token):
     # Owner can delete
     r3 = client.delete(f"/recipes/{rec_id}", headers=auth_headers(user_token))
     assert r3.status_code == 204
+
+def _make(client, token, title):
+    r = client.post("/recipes", json={
+        "title": title, "description": "", "ingredients": ["x"], "steps": ["y"]
+    }, headers=auth_headers(token))
+    return r.json()["id"]
+
+def test_list_recipes_sort_by_likes_count(client, user_token, bob_token):
+    quiet = _make(client, user_token, "Quiet")
+    popular = _make(client, user_token, "Popular")
+    client.post(f"/recipes/{popular}/like", headers=auth_headers(user_token))
+    client.post(f"/recipes/{popular}/like", headers=auth_headers(bob_token))
+
+    r = client.get("/recipes", params={"sort_by": "likes_count", "sort_dir": "desc"})
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert [i["id"] for i in items] == [popular, quiet]
+    assert items[0]["likes_count"] == 2
+
+def test_reconcile_counters(client, user_token, db_session):
+    from backend.models.recipes import Recipe
+    from backend.crud.recipes import reconcile_counters
+
+    rid = _make(client, user_token, "Drifted")
+    client.post(f"/recipes/{rid}/save", headers=auth_headers(user_token))
+
+    # simulate drift
+    db_session.query(Recipe).filter(Recipe.id == rid).update({Recipe.likes_count: 7, Recipe.saves_count: 0})
+    db_session.commit()
+
+    assert run_async(reconcile_counters) == 1
+    body = client.get(f"/recipes/{rid}").json()
+    assert body["likes_count"] == 0
+    assert body["saves_count"] == 1
+    assert run_async(reconcile_counters) == 0
+
+def _walk(client, path, headers=None, **params):
+    seen, cursor = [], None
+    while True:
+        q = dict(params, **({"cursor": cursor} if cursor else {}))
+        body = client.get(path, params=q, headers=headers).json()
+        seen.extend(i["id"] for i in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return seen
+
+def test_list_recipes_cursor_pagination(client, user_token):
+    # duplicate titles exercise the id tiebreaker
+    ids = [_make(client, user_token, title) for title in ["b", "a", "b", "c", "a"]]
+
+    walked = _walk(client, "/recipes", sort_by="title", sort_dir="asc", limit=2)
+    offset_all = [i["id"] for i in client.get("/recipes", params={"sort_by": "title", "sort_dir": "asc", "limit": 100}).json()["items"]]
+    assert walked == offset_all
+    assert sorted(walked) == sorted(ids)
+
+    assert _walk(client, "/recipes", sort_by="id", sort_dir="desc", limit=3) == sorted(ids, reverse=True)
+    # default sort (created_at desc) round-trips a datetime through the cursor
+    assert _walk(client, "/recipes", limit=2) == [i["id"] for i in client.get("/recipes").json()["items"]]
+
+def test_list_recipes_cursor_rejects_mismatched_sort(client, user_token):
+    for t in ["x", "y"]:
+        _make(client, user_token, t)
+    cursor = client.get("/recipes", params={"limit": 1}).json()["next_cursor"]
+    assert cursor
+    assert client.get("/recipes", params={"cursor": cursor, "sort_by": "title"}).status_code == 400
+    assert client.get("/recipes", params={"cursor": "not-a-cursor"}).status_code == 400
+
+def _make_described(client, token, title, description):
+    r = client.post("/recipes", json={
+        "title": title, "description": description, "ingredients": ["x"], "steps": ["y"]
+    }, headers=auth_headers(token))
+    return r.json()["id"]
+
+def _search(client, q, **params):
+    r = client.get("/recipes", params={"q": q, **params})
+    assert r.status_code == 200
+    return [i["id"] for i in r.json()["items"]]
+
+def test_search_matches_title_description_and_prefix(client, user_token):
+    soup = _make_described(client, user_token, "Tomato soup", "Warm and simple")
+    cake = _make_described(client, user_token, "Carrot cake", "Sweet, with walnuts")
+
+    assert _search(client, "tomato") == [soup]
+    assert _search(client, "walnuts") == [cake]
+    assert _search(client, "carr") == [cake]          # prefix match
+    assert _search(client, "tomato walnuts") == []    # all words must match
+    assert _search(client, "%%") == []
+
+def test_search_index_follows_update_and_delete(client, user_token):
+    rid = _make_described(client, user_token, "Plain rice", None)
+    assert _search(client, "risotto") == []
+
+    client.patch(f"/recipes/{rid}", json={"title": "Mushroom risotto"}, headers=auth_headers(user_token))
+    assert _search(client, "risotto") == [rid]
+    assert _search(client, "rice") == []
+
+    client.delete(f"/recipes/{rid}", headers=auth_headers(user_token))
+    assert _search(client, "risotto") == []
+
+def test_search_sort_by_relevance(client, user_token):
+    weak = _make_described(client, user_token, "Soup", "a hint of garlic in a long description about soup and bread")
+    strong = _make_described(client, user_token, "Garlic bread", "garlic, garlic and more garlic")
+
+    assert _search(client, "garlic", sort_by="relevance") == [strong, weak]
+    assert client.get("/recipes", params={"sort_by": "relevance"}).status_code == 400
+
+    # relevance pages walk with a cursor too
+    first = client.get("/recipes", params={"q": "garlic", "sort_by": "relevance", "limit": 1}).json()
+    second = client.get("/recipes", params={"q": "garlic", "sort_by": "relevance", "limit": 1, "cursor": first["next_cursor"]}).json()
+    assert [i["id"] for i in first["items"] + second["items"]] == [strong, weak]
+    assert second["next_cursor"] is None
+
+def test_list_recipes_total_modes(client, user_token):
+    for t in ["one", "two", "three"]:
+        _make(client, user_token, t)
+
+    body = client.get("/recipes", params={"total": "none", "limit": 2}).json()
+    assert body["total"] is None
+    assert body["has_more"] is True
+    body = client.get("/recipes", params={"total": "none", "limit": 3}).json()
+    assert body["has_more"] is False
+
+    assert client.get("/recipes", params={"total": "estimated"}).json()["total"] == 3
+    assert client.get("/recipes", params={"total": "exact", "q": "two"}).json()["total"] == 1
+    assert client.get("/recipes", params={"total": "bogus"}).status_code == 422
+
+def test_cached_total_invalidated_by_writes(client, user_token):
+    rid = _make(client, user_token, "first")
+    assert client.get("/recipes").json()["total"] == 1   # primes the cache
+    _make(client, user_token, "second")
+    assert client.get("/recipes").json()["total"] == 2
+    client.delete(f"/recipes/{rid}", headers=auth_headers(user_token))
+    assert client.get("/recipes").json()["total"] == 1
+
+def test_viewer_flags(client, user_token, bob_token):
+    liked = _make(client, user_token, "liked")
+    saved = _make(client, user_token, "saved")
+    _make(client, user_token, "neither")
+    client.post(f"/recipes/{liked}/like", headers=auth_headers(bob_token))
+    client.post(f"/recipes/{saved}/save", headers=auth_headers(bob_token))
+
+    anon = client.get("/recipes").json()["items"]
+    assert all(i["liked_by_me"] is None and i["saved_by_me"] is None for i in anon)
+
+    flags = {i["title"]: (i["liked_by_me"], i["saved_by_me"])
+             for i in client.get("/recipes", headers=auth_headers(bob_token)).json()["items"]}
+    assert flags == {"liked": (True, False), "saved": (False, True), "neither": (False, False)}
+
+    detail = client.get(f"/recipes/{liked}", headers=auth_headers(bob_token)).json()
+    assert (detail["liked_by_me"], detail["saved_by_me"]) == (True, False)
+
+    mine = client.get("/recipes/me/saves", headers=auth_headers(bob_token)).json()["items"]
+    assert [(i["id"], i["liked_by_me"], i["saved_by_me"]) for i in mine] == [(saved, False, True)]
+
+    assert client.get("/recipes", headers=auth_headers("garbage")).status_code == 401
+
+def test_batch_get_preserves_order_and_reports_missing(client, user_token, bob_token):
+    a, b, c = (_make(client, user_token, t) for t in ["a", "b", "c"])
+    client.post(f"/recipes/{b}/like", headers=auth_headers(bob_token))
+
+    r = client.get("/recipes/batch", params={"ids": f"{c},{a},999999,{b},{a}"}, headers=auth_headers(bob_token))
+    assert r.status_code == 200
+    body = r.json()
+    assert [i["id"] for i in body["items"]] == [c, a, b]
+    assert body["missing"] == [999999]
+    assert [i["liked_by_me"] for i in body["items"]] == [False, False, True]
+    assert body["items"][2]["likes_count"] == 1
+
+    # repeated form works too, anonymous gets no flags
+    body = client.get("/recipes/batch", params=[("ids", str(a)), ("ids", str(b))]).json()
+    assert [i["id"] for i in body["items"]] == [a, b]
+    assert body["items"][0]["liked_by_me"] is None
+
+def test_batch_get_validation(client):
+    assert client.get("/recipes/batch", params={"ids": "1,x"}).status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 102))
+    assert client.get("/recipes/batch", params={"ids": too_many}).status_code == 400
+    # the size check comes before parsing and dedup: repeats and junk are still too many
+    r = client.get("/recipes/batch", params={"ids": ",".join(["x"] * 101)})
+    assert r.status_code == 400 and "At most" in r.json()["detail"]
+    assert client.get("/recipes/batch", params=[("ids", "1")] * 101).status_code == 400
+    assert client.get("/recipes/batch").status_code == 422
+
+def test_list_recipes_query_budget(client, user_token, bob_token):
+    from tests.conftest import query_budget
+    rids = [_make(client, user_token, f"Budget {i}") for i in range(30)]
+    for rid in rids[::3]:
+        client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token))
+
+    # count + page + viewer flags, however many rows the page holds
+    for limit in (2, 30):
+        with query_budget(3):
+            r = client.get("/recipes", params={"limit": limit}, headers=auth_headers(bob_token))
+        assert len(r.json()["items"]) == limit
+    with query_budget(2):
+        client.get(f"/recipes/{rids[0]}", headers=auth_headers(bob_token))
@@ -30,3 +30,99 @@ def test_save_flow_idempotent_and_listing(client, user_token):
     r4 = client.delete(f"/recipes/{rid1}/save", headers=auth_headers(user_token))
     assert r4.status_code == 200
     assert r4.json()["saved"] is False
+    assert r4.json()["saves_count"] == 0
+    assert r3.json()["saves_count"] == 1
+
+def test_saved_list_cursor_pagination(client, user_token):
+    rids = [_make_recipe(client, user_token, f"C{i}") for i in range(5)]
+    for rid in rids:
+        client.post(f"/recipes/{rid}/save", headers=auth_headers(user_token))
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/recipes/me/saves", params=params, headers=auth_headers(user_token)).json()
+        seen.extend(i["id"] for i in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(reversed(rids))
+
+def test_saved_total_tracks_save_and_unsave(client, user_token):
+    rid = _make_recipe(client, user_token, "T")
+    h = auth_headers(user_token)
+    assert client.get("/recipes/me/saves", headers=h).json()["total"] == 0
+    client.post(f"/recipes/{rid}/save", headers=h)
+    assert client.get("/recipes/me/saves", headers=h).json()["total"] == 1
+    client.delete(f"/recipes/{rid}/save", headers=h)
+    assert client.get("/recipes/me/saves", headers=h).json()["total"] == 0
+
+def test_saved_estimated_total_is_per_user(client, user_token, bob_token, monkeypatch):
+    from backend.crud import counts
+
+    seen = []
+    real_count_total = counts.count_total
+
+    async def spy(*args, **kwargs):
+        seen.append(kwargs.get("filters", ()))
+        return await real_count_total(*args, **kwargs)
+
+    monkeypatch.setattr("backend.crud.saves.count_total", spy)
+
+    rids = [_make_recipe(client, bob_token, f"E{i}") for i in range(3)]
+    for rid in rids:
+        client.post(f"/recipes/{rid}/save", headers=auth_headers(bob_token))
+    client.post(f"/recipes/{rids[0]}/save", headers=auth_headers(user_token))
+
+    r = client.get("/recipes/me/saves", params={"total": "estimated"}, headers=auth_headers(user_token))
+    assert r.json()["total"] == 1
+    r = client.get("/recipes/me/saves", params={"total": "estimated"}, headers=auth_headers(bob_token))
+    assert r.json()["total"] == 3
+    # marked as filtered, so PostgreSQL estimates from EXPLAIN rather than pg_class.reltuples
+    assert seen and all(any(f is not None for f in filters) for filters in seen)
+
+def test_saved_total_drops_when_recipe_author_is_deleted(client, user_token, bob_token):
+    rid = _make_recipe(client, bob_token, "Bob's")
+    h = auth_headers(user_token)
+    client.post(f"/recipes/{rid}/save", headers=h)
+    assert client.get("/recipes/me/saves", headers=h).json()["total"] == 1  # now cached
+
+    assert client.delete("/users/me", headers=auth_headers(bob_token)).status_code == 204
+    body = client.get("/recipes/me/saves", headers=h).json()
+    assert body["items"] == []
+    assert body["total"] == 0
+
+def test_saved_list_has_creator_counts_and_saved_at(client, user_token, bob_token):
+    rid = _make_recipe(client, user_token, "Full")
+    client.post(f"/recipes/{rid}/like", headers=auth_headers(bob_token))
+    client.post(f"/recipes/{rid}/save", headers=auth_headers(bob_token))
+
+    item = client.get("/recipes/me/saves", headers=auth_headers(bob_token)).json()["items"][0]
+    assert item["created_by"]["username"] == "alice"
+    assert item["likes_count"] == 1
+    assert item["saves_count"] == 1
+    assert item["saved_at"] is not None
+
+def test_saved_list_sort_by_id_cursor(client, user_token):
+    rids = [_make_recipe(client, user_token, f"I{i}") for i in range(3)]
+    for rid in rids:
+        client.post(f"/recipes/{rid}/save", headers=auth_headers(user_token))
+
+    h = auth_headers(user_token)
+    first = client.get("/recipes/me/saves", params={"limit": 2, "sort_by": "id"}, headers=h).json()
+    second = client.get("/recipes/me/saves", params={"limit": 2, "sort_by": "id", "cursor": first["next_cursor"]}, headers=h).json()
+    assert [i["id"] for i in first["items"] + second["items"]] == list(reversed(rids))
+    # a cursor only works with the sort it was issued for
+    assert client.get("/recipes/me/saves", params={"cursor": first["next_cursor"]}, headers=h).status_code == 400
+
+
+def test_saved_list_query_budget(client, user_token, bob_token):
+    from tests.conftest import query_budget
+    for i in range(25):
+        rid = _make_recipe(client, user_token, f"Budget {i}")
+        client.post(f"/recipes/{rid}/save", headers=auth_headers(bob_token))
+
+    # count + page (creators joined in) + viewer flags; no per-recipe creator or counter lookups
+    with query_budget(3):
+        r = client.get("/recipes/me/saves", params={"limit": 25}, headers=auth_headers(bob_token))
+    assert len(r.json()["items"]) == 25
@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine, func, select
+
+from backend.migrations import migrate
+from backend.models.likes import Like
+from backend.models.recipes import Recipe
+from backend.models.saved_recipe import SavedRecipe
+from backend.models.tags import recipe_tags
+from backend.models.user import User
+from backend.seed import SeedPlan, seed
+
+PLAN = SeedPlan(users=60, recipes=150, tags=12, likes_per_user=8, saves_per_user=3, batch_size=97)
+
+
+def _seeded(path, plan=PLAN):
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine)
+    counts = seed(engine, plan, "not-a-real-hash")
+    return engine, counts
+
+
+def _dump(engine):
+    with engine.connect() as conn:
+        return {
+            table.name: conn.execute(select(table).order_by(*table.primary_key.columns)).all()
+            for table in (User.__table__, Recipe.__table__, recipe_tags, Like.__table__, SavedRecipe.__table__)
+        }
+
+
+def test_seed_writes_the_plan(tmp_path):
+    engine, counts = _seeded(tmp_path / "a.db")
+    assert counts["users"] == 60
+    assert counts["recipes"] == 150
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Like.__table__)) == counts["likes"] > 0
+        assert conn.scalar(select(func.count()).select_from(SavedRecipe.__table__)) == counts["saved_recipes"] > 0
+        # counters are written without a reconcile pass and must agree with the rows
+        likes = select(func.count(Like.id)).where(Like.recipe_id == Recipe.id).scalar_subquery()
+        saves = select(func.count(SavedRecipe.id)).where(SavedRecipe.recipe_id == Recipe.id).scalar_subquery()
+        drifted = conn.scalar(
+            select(func.count()).select_from(Recipe).where((Recipe.likes_count != likes) | (Recipe.saves_count != saves))
+        )
+        assert drifted == 0
+        # nobody likes or posts before they exist
+        assert conn.scalar(
+            select(func.count()).select_from(Recipe).join(User, User.id == Recipe.created_by_id)
+            .where(Recipe.created_at < User.created_at)
+        ) == 0
+        lengths = [len(i) for i in conn.scalars(select(Recipe.ingredients))]
+        assert 2 <= min(lengths) and 6 <= sum(lengths) / len(lengths) <= 12
+    engine.dispose()
+
+
+def test_seed_is_deterministic(tmp_path):
+    a, _ = _seeded(tmp_path / "a.db")
+    b, _ = _seeded(tmp_path / "b.db")
+    assert _dump(a) == _dump(b)
+    c, _ = _seeded(tmp_path / "c.db", SeedPlan(**{**PLAN.__dict__, "seed": 7}))
+    assert _dump(a) != _dump(c)
+    for engine in (a, b, c):
+        engine.dispose()
+
+
+def test_seed_appends_to_existing_data(tmp_path):
+    engine, _ = _seeded(tmp_path / "a.db")
+    counts = seed(engine, SeedPlan(users=5, recipes=5, tags=12, seed=1), "not-a-real-hash")
+    assert counts["users"] == 5
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(User)) == 65
+    engine.dispose()
@@ -1,4 +1,4 @@
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, run_async
 
 def test_tags_crud_admin_only(client, admin_token, user_token):
     # non-admin cannot create
@@ -28,3 +28,71 @@ def test_tags_crud_admin_only(client, admin_token, user_token):
     # delete
     r6 = client.delete(f"/tags/{tid}", headers=auth_headers(admin_token))
     assert r6.status_code == 204
+
+def _tag(client, admin_token, name):
+    return client.post("/tags", json={"name": name}, headers=auth_headers(admin_token)).json()["id"]
+
+def _tagged_recipe(client, token, title, tag_ids):
+    r = client.post("/recipes", json={
+        "title": title, "description": "", "ingredients": ["a"], "steps": ["b"], "tag_ids": tag_ids
+    }, headers=auth_headers(token))
+    assert r.status_code == 201
+    return r.json()["id"]
+
+def test_filter_recipes_by_tags(client, admin_token, user_token):
+    veg, quick = _tag(client, admin_token, "Vegan"), _tag(client, admin_token, "Quick")
+    salad = _tagged_recipe(client, user_token, "Salad", [veg, quick])
+    stew = _tagged_recipe(client, user_token, "Stew", [veg])
+    _tagged_recipe(client, user_token, "Plain", [])
+
+    def ids(**params):
+        body = client.get("/recipes", params=params).json()
+        return sorted(i["id"] for i in body["items"]), body["total"]
+
+    assert ids(tag_ids=[veg]) == (sorted([salad, stew]), 2)
+    assert ids(tag_ids=[veg, quick]) == (sorted([salad, stew]), 2)
+    assert ids(tag_ids=[veg, quick], tag_match="all") == ([salad], 1)
+
+def test_tag_facets(client, admin_token, user_token):
+    veg, quick, sweet = (_tag(client, admin_token, n) for n in ["Vegan", "Quick", "Sweet"])
+    _tagged_recipe(client, user_token, "Salad", [veg, quick])
+    _tagged_recipe(client, user_token, "Stew", [veg])
+    _tagged_recipe(client, user_token, "Cake", [sweet])
+
+    body = client.get("/recipes", params={"facets": "tags"}).json()
+    assert body["facets"]["tags"] == [
+        {"id": veg, "name": "Vegan", "count": 2},
+        {"id": quick, "name": "Quick", "count": 1},
+        {"id": sweet, "name": "Sweet", "count": 1},
+    ]
+
+    # facets follow the current filter
+    body = client.get("/recipes", params={"facets": "tags", "q": "salad"}).json()
+    assert {t["name"]: t["count"] for t in body["facets"]["tags"]} == {"Vegan": 1, "Quick": 1}
+
+    assert client.get("/recipes").json()["facets"] is None
+
+def test_tags_only_embedded_on_request(client, admin_token, user_token):
+    veg = _tag(client, admin_token, "Vegan")
+    rid = _tagged_recipe(client, user_token, "Salad", [veg])
+
+    assert client.get(f"/recipes/{rid}").json()["tags"] is None
+    assert client.get(f"/recipes/{rid}", params={"include": "tags"}).json()["tags"] == [{"id": veg, "name": "Vegan"}]
+
+    items = client.get("/recipes").json()["items"]
+    assert items[0]["tags"] is None
+    items = client.get("/recipes", params={"include": "tags"}).json()["items"]
+    assert items[0]["tags"] == [{"id": veg, "name": "Vegan"}]
+
+def test_recipe_loads_leave_tags_unloaded(client, admin_token, user_token, db_session):
+    from sqlalchemy import inspect
+    from backend.crud.recipes import get_recipe_by_id, list_recipes
+
+    rid = _tagged_recipe(client, user_token, "Salad", [_tag(client, admin_token, "Vegan")])
+
+    recipe, _, _ = run_async(lambda db: get_recipe_by_id(db, rid))
+    assert "tags" in inspect(recipe).unloaded
+    recipes, _, _ = run_async(list_recipes)
+    assert all("tags" in inspect(r).unloaded for r in recipes)
+    recipe, _, _ = run_async(lambda db: get_recipe_by_id(db, rid, include=["tags"]))
+    assert "tags" not in inspect(recipe).unloaded
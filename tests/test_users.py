@@ -1,4 +1,4 @@
-from tests.conftest import auth_headers, _register, _login
+from tests.conftest import auth_headers, _register, _login, async_engine
 
 def test_update_me_and_get_me(client, user_token):
     # Update profile
@@ -58,3 +58,56 @@ def test_admin_delete_user(client, admin_token):
     uid = [u["id"] for u in r.json()["items"] if u["username"] == "todelete"][0]
     r2 = client.delete(f"/users/{uid}", headers=auth_headers(admin_token))
     assert r2.status_code == 204
+
+def test_admin_list_users_cursor(client, admin_token):
+    for i in range(4):
+        _register(client, f"cur{i}", f"cur{i}@example.com")
+    first = client.get("/users", params={"limit": 3, "sort_by": "username", "sort_dir": "asc"}, headers=auth_headers(admin_token)).json()
+    assert first["next_cursor"]
+    second = client.get("/users", params={"limit": 3, "sort_by": "username", "sort_dir": "asc", "cursor": first["next_cursor"]}, headers=auth_headers(admin_token)).json()
+    names = [u["username"] for u in first["items"] + second["items"]]
+    assert names == sorted(names)
+    assert len(names) == 5 and second["next_cursor"] is None
+
+
+def test_principal_cache_skips_user_lookup(client, user_token, db_session):
+    from sqlalchemy import event
+
+    client.get("/recipes/me/saves", headers=auth_headers(user_token))  # warm the cache
+
+    seen = []
+    def _record(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        r = client.get("/recipes/me/saves", headers=auth_headers(user_token))
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert r.status_code == 200
+    assert not any("FROM users" in s for s in seen)
+
+
+def test_principal_cache_invalidated_by_admin_update(client, admin_token, user_token):
+    from backend.core.principal import principal_cache
+
+    me = client.get("/users/me", headers=auth_headers(user_token)).json()
+    assert principal_cache.get(me["id"]).username == me["username"]
+
+    r = client.patch(f"/users/{me['id']}", json={"username": "renamed"}, headers=auth_headers(admin_token))
+    assert r.status_code == 200
+    assert principal_cache.get(me["id"]) is None
+
+    client.get("/recipes/me/saves", headers=auth_headers(user_token))
+    assert principal_cache.get(me["id"]).username == "renamed"
+
+
+def test_principal_cache_invalidated_by_admin_delete(client, admin_token, user_token):
+    me = client.get("/users/me", headers=auth_headers(user_token)).json()
+    client.get("/recipes/me/saves", headers=auth_headers(user_token))
+
+    r = client.delete(f"/users/{me['id']}", headers=auth_headers(admin_token))
+    assert r.status_code == 204
+    r = client.get("/recipes/me/saves", headers=auth_headers(user_token))
+    assert r.status_code == 401